@@ -9,25 +9,74 @@ Unofficial Python wrapper for official Hacker News API
 
 from __future__ import absolute_import
 from __future__ import unicode_literals
-import asyncio
 import datetime
+import functools
 import json
 import sys
+import time
+import weakref
 from urllib.parse import urljoin
 
-import requests
-import aiohttp
-
+from .archive import Archive
+from .concurrency import AdaptiveLimiter, Limiter
+from .connection import ConnectionPolicy
+from .hedging import HedgePolicy, LatencyHistogram
+from .lazy import Loader, Queue, Ref
+from .loop import EventLoopThread
+from .search import SearchIndex
+from .prefetch import PrefetchPolicy
+from .progress import Progress
 from .settings import supported_api_versions
+from .store import CompressedStore, MemoryStore
+from .threads import ThreadStats
+from .transport import CassetteMiss, RecordingTransport, ReplayTransport
+from .utils import timestamp
 
 __all__ = [
+    'AdaptiveLimiter',
+    'Archive',
+    'BatchResult',
+    'CassetteMiss',
+    'CompressedStore',
+    'ConnectionPolicy',
     'User',
     'Item',
     'HackerNews',
     'HackerNewsError',
+    'HedgePolicy',
     'InvalidAPIVersion',
     'InvalidItemID',
-    'InvalidUserID']
+    'InvalidUserID',
+    'LatencyHistogram',
+    'Limiter',
+    'MemoryStore',
+    'PrefetchPolicy',
+    'Progress',
+    'RecordingTransport',
+    'ReplayTransport',
+    'SearchIndex',
+    'ThreadStats']
+
+
+def _as_progress(progress):
+    """Wraps a progress callback into a `Progress` object"""
+    if progress is None or isinstance(progress, Progress):
+        return progress
+    return Progress(progress)
+
+
+async def _close_sessions(sessions):
+    import asyncio
+    session = sessions.pop(asyncio.get_running_loop(), None)
+    sessions.clear()
+    if session is not None:
+        await session.close()
+
+
+def _release(loop_thread, sessions):
+    """Closes the aiohttp session of a client and stops its loop, on
+    `close()` or once the client is garbage collected"""
+    loop_thread.stop(_close_sessions(sessions))
 
 
 class HackerNewsError(Exception):
@@ -52,12 +101,37 @@ class HTTPError(HackerNewsError):
 
 class HackerNews(object):
 
-    def __init__(self, version='v0'):
+    def __init__(self, version='v0', lazy=False, store=None, index=None,
+                 concurrency=None, hedge=None, prefetch=None,
+                 transport=None, connection=None):
         """
 
         Args:
             version (string): specifies Hacker News API version.
             Default is `v0`.
+            lazy (bool): Flag to turn `by`, `kids`, `parent`, `poll` and
+                `parts` of returned items into lazy handles. Handles
+                touched together are fetched in one batch.
+            store (obj): (optional) item store such as `Archive`. Item
+                lookups are served from it when possible and fetched
+                items are added to it.
+            index (obj): (optional) `SearchIndex` that items are added to
+                as they are fetched or read from `store`.
+            concurrency (int or obj): (optional) maximum number of async
+                requests in flight, or a `Limiter` such as
+                `AdaptiveLimiter` to control it. Default is 100.
+            hedge (obj): (optional) `HedgePolicy` to send a duplicate of
+                async requests that are slower than usual.
+            prefetch (obj): (optional) `PrefetchPolicy` to fetch the first
+                comments of story lists in the background, into a cache
+                that only item lookups by id read.
+            transport (obj): (optional) `RecordingTransport` to record
+                responses to a cassette, or `ReplayTransport` to serve
+                them from one instead of the network. It is closed with
+                the client.
+            connection (obj): (optional) `ConnectionPolicy` for TLS, DNS
+                caching and keep-alive of async connections. Certificates
+                are verified by default.
 
         Raises:
           InvalidAPIVersion: If Hacker News version is not supported.
@@ -69,7 +143,57 @@ class HackerNews(object):
             raise InvalidAPIVersion
         self.item_url = urljoin(self.base_url, 'item/')
         self.user_url = urljoin(self.base_url, 'user/')
-        self.session = requests.Session()
+        self._session = None
+        self._loop_thread = EventLoopThread()
+        # aiohttp session by event loop
+        self._aio_sessions = {}
+        # a client that is dropped without close() still stops its loop
+        weakref.finalize(
+            self, _release, self._loop_thread, self._aio_sessions)
+        self.lazy = lazy
+        self.prefetch = prefetch
+        self._warm = None
+        if prefetch is not None:
+            self._warm = MemoryStore(
+                prefetch.max_entries, prefetch.max_bytes, prefetch.ttl)
+        self.store = store
+        self._prefetch_future = None
+        self.index = index
+        if concurrency is None:
+            concurrency = 100
+        if isinstance(concurrency, int):
+            concurrency = Limiter(concurrency)
+        self.limiter = concurrency
+        self.hedge = hedge
+        self.transport = transport
+        self.connection = connection or ConnectionPolicy()
+        self.request_latency = LatencyHistogram()
+        self.batch_latency = LatencyHistogram()
+        self._item_loader = Loader(
+            lambda ids: self.get_items_by_ids(ids, priority='interactive'),
+            lambda item: item.item_id
+        )
+        self._user_loader = Loader(
+            lambda ids: self.get_users_by_ids(ids, priority='interactive'),
+            lambda user: user.user_id
+        )
+
+    @property
+    def session(self):
+        """The `requests` session of the synchronous API
+
+        `requests` is imported and the session created on first use, so
+        clients that only use the async path never load it.
+
+        """
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
 
     def _get_sync(self, url):
         """Internal method used for GET requests
@@ -83,62 +207,267 @@ class HackerNews(object):
         Raises:
           HTTPError: If HTTP request failed.
         """
-        response = self.session.get(url)
-        if response.status_code == requests.codes.ok:
-            return response.json()
+        if self.transport is not None:
+            status, body = self.transport.get(url, self._send_sync)
+        else:
+            status, body = self._send_sync(url)
+        if status == 200:
+            return json.loads(body)
         else:
             raise HTTPError
 
-    async def _get_async(self, url, session):
+    def _send_sync(self, url):
+        """Returns the HTTP status and body of a GET request to `url`"""
+        response = self.session.get(url, timeout=self.connection.timeout)
+        return response.status_code, response.content
+
+    async def _get_async(self, url, session, priority='normal',
+                         progress=None):
         """Asynchronous internal method used for GET requests
 
         Args:
             url (str): URL to fetch
             session (obj): aiohttp client session for async loop
+            priority (str): scheduling lane, one of `interactive`,
+                `normal` or `bulk`.
+            progress (obj): (optional) `Progress` to record the request in
 
         Returns:
             data (obj): Individual URL request's response corountine
 
+        Raises:
+          HTTPError: If the server did not answer with 200 OK.
+
         """
-        data = None
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                data = await resp.json()
+        import asyncio
+        limiter = self.limiter
+        await limiter.acquire(priority)
+        started = time.monotonic()
+        try:
+            data, status, size = await self._hedged_request_async(
+                url, session)
+        except asyncio.CancelledError:
+            limiter.release()
+            raise
+        except Exception as e:
+            limiter.release(
+                time.monotonic() - started, failed=True, started=started)
+            if progress is not None:
+                progress.update(error=type(e).__name__)
+            raise
+        latency = time.monotonic() - started
+        limiter.release(
+            latency, failed=status == 429 or status >= 500, started=started)
+        self.request_latency.record(latency)
+        if self.hedge is not None:
+            self.hedge.observe(latency)
+        if progress is not None:
+            progress.update(size, None if status == 200 else status)
+        if status != 200:
+            raise HTTPError(F"{status} {url}")
         return data
 
-    async def _async_loop(self, urls):
+    async def _hedged_request_async(self, url, session):
+        """Requests `url`, sending a duplicate request if the first one is
+        slower than `self.hedge` allows, and returns the first good response
+
+        """
+        import asyncio
+        hedge = self.hedge
+        delay = hedge.delay() if hedge is not None else None
+        if delay is None:
+            return await self._request_async(url, session)
+        primary = asyncio.ensure_future(self._request_async(url, session))
+        attempts = {primary}
+        try:
+            done, attempts = await asyncio.wait(attempts, timeout=delay)
+            if done:
+                return primary.result()
+            if hedge.allow():
+                backup = asyncio.ensure_future(
+                    self._request_async(url, session))
+                attempts.add(backup)
+            while True:
+                done, attempts = await asyncio.wait(
+                    attempts, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not primary:
+                            hedge.wins += 1
+                        return attempt.result()
+                if not attempts:
+                    return done.pop().result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def _request_async(self, url, session):
+        """Returns the JSON response of `url`, its HTTP status and the size
+        of the response body"""
+        if self.transport is not None:
+            status, body = await self.transport.fetch(
+                url, functools.partial(self._send_async, session=session))
+        else:
+            status, body = await self._send_async(url, session)
+        data = json.loads(body) if status == 200 else None
+        return data, status, len(body)
+
+    async def _send_async(self, url, session=None):
+        """Returns the HTTP status and body of a GET request to `url`"""
+        if session is None:
+            session = await self._client_session()
+        async with session.get(url) as resp:
+            return resp.status, await resp.read()
+
+    @property
+    def _pool_size(self):
+        """Maximum number of pooled async connections"""
+        return max(100, self.limiter.maximum)
+
+    async def _client_session(self):
+        """Returns the aiohttp session shared by all async requests
+
+        The session and its connection pool live on the client's event loop
+        thread and are created on first use.
+
+        """
+        import asyncio
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        session = self._aio_sessions.get(loop)
+        if session is None or session.closed:
+            # sessions of a loop that was stopped, e.g. by a fork, are
+            # dropped with it
+            self._aio_sessions.clear()
+            session = aiohttp.ClientSession(
+                connector=self.connection.connector(self._pool_size),
+                timeout=self.connection.client_timeout()
+            )
+            self._aio_sessions[loop] = session
+        return session
+
+    async def _async_loop(self, urls, priority='normal', failed=None,
+                          progress=None):
         """Asynchronous internal method used to request multiple URLs
 
         Args:
             urls (list): URLs to fetch
+            priority (str): scheduling lane of the requests
+            failed (set): (optional) indexes of URLs whose request failed
+                are added to it. Their responses are None, just like the
+                responses of missing items.
+            progress (obj): (optional) `Progress` to record requests in
 
         Returns:
             responses (obj): All URL requests' response coroutines
 
         """
+        import asyncio
+        session = None
+        if self.transport is None:
+            session = await self._client_session()
+        started = time.monotonic()
         results = []
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=False)
-        ) as session:
-            for url in urls:
-                result = asyncio.ensure_future(self._get_async(url, session))
-                results.append(result)
-            responses = await asyncio.gather(*results)
+        for count, url in enumerate(urls, 1):
+            result = asyncio.ensure_future(
+                self._get_async(url, session, priority, progress))
+            results.append(result)
+            if count % 1000 == 0:
+                # Let requests of other batches, e.g. interactive lookups
+                # during a crawl, get scheduled while this one is queued.
+                await asyncio.sleep(0)
+        responses = await asyncio.gather(*results, return_exceptions=True)
+        self.batch_latency.record(time.monotonic() - started)
+        if progress is not None:
+            progress.flush()
+        for index, response in enumerate(responses):
+            if isinstance(response, BaseException):
+                responses[index] = None
+                if failed is not None:
+                    failed.add(index)
         return responses
 
-    def _run_async(self, urls):
+    async def _warmup_async(self, n_connections):
+        import asyncio
+        session = await self._client_session()
+        url = urljoin(self.base_url, 'maxitem.json')
+
+        async def connect():
+            async with session.get(url) as resp:
+                await resp.read()
+                return resp.status == 200
+
+        # requests in flight together each need a connection of their own,
+        # which goes back to the pool once they are done
+        results = await asyncio.gather(
+            *[connect() for _ in range(n_connections)],
+            return_exceptions=True)
+        return sum(result is True for result in results)
+
+    def warmup(self, n_connections=10):
+        """Opens pooled connections in advance
+
+        Resolves the API host and completes the TCP and TLS handshakes of
+        `n_connections` connections, which are then kept alive for the
+        next batch. Call it at startup or after a long idle period.
+
+        Args:
+            n_connections (int): number of connections to open, capped at
+                the connection limit.
+
+        Returns:
+            `int` number of connections that completed a request.
+
+        """
+        if self.transport is not None:
+            return 0
+        n_connections = min(n_connections, self._pool_size)
+        return self._loop_thread.run(self._warmup_async(n_connections))
+
+    @property
+    def concurrency_limit(self):
+        """Current in-flight limit of async requests"""
+        return int(self.limiter.limit)
+
+    def _run_async(self, urls, priority='normal', failed=None,
+                   progress=None):
         """Asynchronous event loop execution
 
+        The requests run on the client's background event loop, so this is
+        safe to call from any number of threads, and from code that already
+        runs an event loop of its own.
+
         Args:
             urls (list): URLs to fetch
+            priority (str): scheduling lane of the requests. Requests in the
+                `interactive` lane are dispatched before `normal` ones, and
+                those before `bulk` ones.
+            failed (set): (optional) indexes of URLs whose request failed
+                are added to it.
+            progress (obj): (optional) `Progress` to record requests in
 
         Returns:
             results (obj): All URL requests' responses
 
         """
-        loop = asyncio.get_event_loop()
-        results = loop.run_until_complete(self._async_loop(urls))
-        return results
+        return self._loop_thread.run(
+            self._async_loop(urls, priority, failed, progress))
+
+    def close(self):
+        """Closes the HTTP sessions and stops the background event loop"""
+        self._cancel_prefetch()
+        _release(self._loop_thread, self._aio_sessions)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.transport is not None:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def _get_stories(self, page, limit):
         """
@@ -160,7 +489,146 @@ class HackerNews(object):
         """
         url = urljoin(self.base_url, F"{page}.json")
         story_ids = self._get_sync(url)[:limit]
-        return self.get_items_by_ids(item_ids=story_ids)
+        stories = self.get_items_by_ids(
+            item_ids=story_ids, priority='interactive', cached=False)
+        if self.prefetch is not None:
+            self._start_prefetch(stories)
+        return stories
+
+    def _start_prefetch(self, stories):
+        """Fetches the first comments of `stories` into the warm cache in
+        the background, replacing any prefetch still running"""
+        self._cancel_prefetch()
+        ids = self.prefetch.ids(stories, skip=self._warm)
+        if ids:
+            self._prefetch_future = self._loop_thread.submit(
+                self._prefetch_async(ids))
+
+    def _cancel_prefetch(self):
+        future, self._prefetch_future = self._prefetch_future, None
+        if future is not None and future.cancel():
+            self.prefetch.cancelled += 1
+
+    async def _prefetch_async(self, item_ids):
+        import asyncio
+        session = None
+        if self.transport is None:
+            session = await self._client_session()
+
+        async def prefetch(item_id):
+            url = urljoin(self.item_url, F"{item_id}.json")
+            try:
+                data = await self._get_async(url, session, 'bulk')
+            except Exception:
+                # Prefetching is best effort, the item is fetched again
+                # when it is actually asked for.
+                return
+            if data:
+                self._warm.add(data)
+                if self.index is not None:
+                    self.index.add(data)
+                self.prefetch.prefetched += 1
+
+        await asyncio.gather(*[prefetch(item_id) for item_id in item_ids])
+
+    def _fetch_items(self, item_ids, priority='normal', failed=None,
+                     progress=None, cached=True):
+        """Returns raw item responses for `item_ids`, in the same order
+
+        Items present in `self.store` or the warm cache are read from them
+        unless `cached` is False, the rest are fetched asynchronously and
+        added to the store. Items that could not be found or fetched are
+        returned as None, and the ids of the latter are added to the
+        `failed` set if given.
+
+        """
+        item_ids = list(item_ids)
+        results = [None] * len(item_ids)
+        pending = []
+        hits = []
+        for index, item_id in enumerate(item_ids):
+            data = self._cached(item_id) if cached else None
+            if data:
+                results[index] = data
+                hits.append(data)
+            else:
+                pending.append(index)
+        self._index_hits(hits)
+        if progress is not None:
+            progress.expect(len(item_ids))
+            if len(pending) < len(item_ids):
+                progress.update(count=len(item_ids) - len(pending))
+        if not pending:
+            return results
+        urls = [
+            urljoin(self.item_url, F"{item_ids[i]}.json") for i in pending
+        ]
+        failures = set()
+        responses = self._run_async(
+            urls=urls, priority=priority, failed=failures, progress=progress)
+        for index, data in zip(pending, responses):
+            results[index] = data
+        if failed is not None:
+            failed.update(item_ids[pending[i]] for i in failures)
+        self._ingest([results[i] for i in pending if results[i]])
+        return results
+
+    def _cached(self, item_id):
+        """Returns the response of an item from the store or the warm
+        cache of prefetched comments, or None"""
+        data = None
+        if self.store is not None:
+            data = self.store.get(item_id)
+        if not data and self._warm is not None:
+            data = self._warm.get(item_id)
+        return data
+
+    def _ingest(self, responses):
+        """Adds freshly fetched item responses to the store and index, and
+        refreshes the copies in the warm cache"""
+        if self.store is not None:
+            self.store.extend(responses)
+        if self.index is not None:
+            self.index.extend(responses)
+        if self._warm is not None:
+            self._warm.extend(
+                data for data in responses if data['id'] in self._warm)
+
+    def _index_hits(self, responses):
+        """Adds items read from the store to the index, unless indexed"""
+        if self.index is not None and responses:
+            missing = self.index.missing(data['id'] for data in responses)
+            if missing:
+                self.index.extend(
+                    data for data in responses if data['id'] in missing)
+
+    def _make_item(self, data, queues=None):
+        """Builds an `Item`, attaching lazy handles in lazy mode"""
+        item = Item(data)
+        if self.lazy:
+            self._lazify(item, queues)
+        return item
+
+    def _lazify(self, item, queues=None):
+        """Replaces the ids on `item` with lazy `Ref` handles
+
+        Nothing is fetched here. The ids are queued on `queues`, a pair of
+        user and item `Queue` objects shared by the items of one batch, and
+        fetched as one batch per queue when any of its handles is first
+        read. Ids that are already cached are not queued.
+
+        """
+        users, items = queues or (Queue(), Queue())
+        if item.by:
+            item.by = self._user_loader.load(item.by, users)
+        if item.kids:
+            item.kids = self._item_loader.load_many(item.kids, items)
+        if item.parent:
+            item.parent = self._item_loader.load(item.parent, items)
+        if item.poll:
+            item.poll = self._item_loader.load(item.poll, items)
+        if item.parts:
+            item.parts = self._item_loader.load_many(item.parts, items)
 
     def get_item(self, item_id, expand=False):
         """Returns Hacker News `Item` object.
@@ -183,8 +651,14 @@ class HackerNews(object):
           InvalidItemID: If corresponding Hacker News story does not exist.
 
         """
-        url = urljoin(self.item_url, F"{item_id}.json")
-        response = self._get_sync(url)
+        response = self._cached(item_id)
+        if response:
+            self._index_hits([response])
+        else:
+            url = urljoin(self.item_url, F"{item_id}.json")
+            response = self._get_sync(url)
+            if response:
+                self._ingest([response])
 
         if not response:
             raise InvalidItemID
@@ -192,33 +666,55 @@ class HackerNews(object):
         item = Item(response)
         if expand:
             item.by = self.get_user(item.by)
-            item.kids = self.get_items_by_ids(item.kids) if item.kids else None
+            item.kids = (
+                self.get_items_by_ids(item.kids, priority='interactive')
+                if item.kids else None
+            )
             item.parent = self.get_item(item.parent) if item.parent else None
             item.poll = self.get_item(item.poll) if item.poll else None
             item.parts = (
-                self.get_items_by_ids(item.parts) if item.parts else None
+                self.get_items_by_ids(item.parts, priority='interactive')
+                if item.parts else None
             )
+        elif self.lazy:
+            self._lazify(item)
 
         return item
 
-    def get_items_by_ids(self, item_ids, item_type=None):
+    def get_items_by_ids(self, item_ids, item_type=None, priority='normal',
+                         retries=0, progress=None, cached=True):
         """Given a list of item ids, return all the Item objects
 
         Args:
             item_ids (obj): List of item IDs to query
             item_type (str): (optional) Item type to filter results with
+            priority (str): scheduling lane of the requests, one of
+                `interactive`, `normal` or `bulk`.
+            retries (int): how many times to fetch the failed ids again.
+            progress (obj): (optional) `Progress` object, or a callback
+                taking one, to report completed requests, bytes, errors,
+                throughput and ETA to.
+            cached (bool): serve items from `store` and the prefetched
+                comments when possible. Pass False for current data.
 
         Returns:
-            List of `Item` objects for given item IDs and given item type
+            `BatchResult` of `Item` objects for given item IDs and given
+            item type, in the order of `item_ids`.
 
         """
-        urls = [urljoin(self.item_url, F"{i}.json") for i in item_ids]
-        result = self._run_async(urls=urls)
-        items = [Item(r) for r in result if r]
+        fetch = functools.partial(
+            self._fetch_items, priority=priority,
+            progress=_as_progress(progress), cached=cached)
+        # the lazy handles of one batch are fetched together
+        make = functools.partial(self._make_item, queues=(Queue(), Queue()))
+        batch = BatchResult(list(item_ids), fetch, make)
+        for _ in range(retries):
+            if not batch.failed:
+                break
+            batch.retry()
         if item_type:
-            return [item for item in items if item.item_type == item_type]
-        else:
-            return items
+            batch.keep(lambda item: item.item_type == item_type)
+        return batch
 
     def get_user(self, user_id, expand=False):
         """Returns Hacker News `User` object.
@@ -248,7 +744,8 @@ class HackerNews(object):
 
         user = User(response)
         if expand and user.submitted:
-            items = self.get_items_by_ids(user.submitted)
+            items = self.get_items_by_ids(
+                user.submitted, priority='interactive')
             user_opt = {
                 'stories': 'story',
                 'comments': 'comment',
@@ -265,13 +762,83 @@ class HackerNews(object):
 
         return user
 
-    def get_users_by_ids(self, user_ids):
+    def _fetch_users(self, user_ids, priority='normal', failed=None,
+                     progress=None):
+        """Returns raw user responses for `user_ids`, in the same order"""
+        user_ids = list(user_ids)
+        urls = [urljoin(self.user_url, F"{i}.json") for i in user_ids]
+        failures = set()
+        if progress is not None:
+            progress.expect(len(urls))
+        result = self._run_async(
+            urls=urls, priority=priority, failed=failures, progress=progress)
+        if failed is not None:
+            failed.update(user_ids[i] for i in failures)
+        return result
+
+    def get_users_by_ids(self, user_ids, priority='normal', retries=0,
+                         progress=None):
         """
         Given a list of user ids, return all the User objects
+
+        Returns a `BatchResult` in the order of `user_ids`. Failed ids are
+        fetched again up to `retries` times, and `progress` works as in
+        `get_items_by_ids`.
         """
-        urls = [urljoin(self.user_url, F"{i}.json") for i in user_ids]
-        result = self._run_async(urls=urls)
-        return [User(r) for r in result if r]
+        fetch = functools.partial(
+            self._fetch_users, priority=priority,
+            progress=_as_progress(progress))
+        batch = BatchResult(list(user_ids), fetch, User)
+        for _ in range(retries):
+            if not batch.failed:
+                break
+            batch.retry()
+        return batch
+
+    def resolve_authors(self, items, priority='interactive'):
+        """Replaces the `by` of items with `User` objects, fetching each
+        distinct author once, in a single concurrent batch.
+
+        Expanded `kids` and `parts` are walked too, so a whole comment tree
+        from `get_item(..., expand=True)` is covered.
+
+        Args:
+            items (list): `Item` objects
+            priority (str): scheduling lane of the user requests
+
+        Returns:
+            `BatchResult` of the distinct authors' `User` objects.
+
+        """
+        pending = list(items)
+        seen = set()
+        found = []
+        while pending:
+            item = pending.pop()
+            if not isinstance(item, Item) or id(item) in seen:
+                continue
+            seen.add(id(item))
+            found.append(item)
+            pending.extend(item.kids or ())
+            pending.extend(item.parts or ())
+        authors = {}
+        for item in found:
+            author = item.by
+            if isinstance(author, Ref):
+                author = author.key
+            if isinstance(author, str):
+                authors.setdefault(author, None)
+        users = self.get_users_by_ids(list(authors), priority=priority)
+        by_id = {user.user_id: user for user in users}
+        # lazy handles queued for these authors need no request of their own
+        for author in authors:
+            if author not in users.failed:
+                self._user_loader.prime(author, by_id.get(author))
+        for item in found:
+            author = item.by.key if isinstance(item.by, Ref) else item.by
+            if isinstance(author, str) and author in by_id:
+                item.by = by_id[author]
+        return users
 
     def top_stories(self, raw=False, limit=None):
         """Returns list of item ids of current top stories
@@ -372,7 +939,8 @@ class HackerNews(object):
         url = urljoin(self.base_url, 'updates.json')
         response = self._get_sync(url)
         return {
-            'items': self.get_items_by_ids(item_ids=response['items']),
+            'items': self.get_items_by_ids(
+                item_ids=response['items'], cached=False),
             'profiles': self.get_users_by_ids(user_ids=response['profiles'])
         }
 
@@ -397,32 +965,135 @@ class HackerNews(object):
         else:
             return response
 
-    def get_all(self):
+    def _probe_time(self, item_id, stop):
+        """Returns the first `(id, time)` at or after `item_id` and before
+        `stop`, skipping deleted and missing items, or None"""
+        for probe_id in range(item_id, stop):
+            data = None
+            if self.store is not None:
+                data = self.store.get(probe_id)
+            if not data:
+                url = urljoin(self.item_url, F"{probe_id}.json")
+                data = self._get_sync(url)
+            if data and data.get('time') is not None:
+                return probe_id, data['time']
+        return None
+
+    def _first_id_at(self, when, low, high, low_time, high_time):
+        """Returns the smallest item id in `[low, high)` posted at or after
+        unix time `when`, or `high` if there is none
+
+        Steps alternate between interpolating on the known times of the
+        bounds and plain bisection, so the search takes few probes on the
+        roughly linear id space and never more than a binary search would.
+
+        """
+        interpolate = True
+        while low < high:
+            middle = (low + high) // 2
+            if (interpolate and low_time is not None and
+                    high_time is not None and high_time > low_time):
+                fraction = (when - low_time) / (high_time - low_time)
+                guess = low + int(fraction * (high - low))
+                middle = min(max(guess, low), high - 1)
+            interpolate = not interpolate
+            probe = self._probe_time(middle, high)
+            if probe is None:
+                high = middle
+            elif probe[1] < when:
+                low, low_time = probe[0] + 1, probe[1]
+            else:
+                high, high_time = middle, probe[1]
+        return low
+
+    def get_ids_between(self, start, end):
+        """Returns the range of item ids posted between `start` and `end`
+
+        Found with the same probing search as `get_items_between`, without
+        fetching the items in between.
+
+        Args:
+            start (datetime or int): earliest posting time, inclusive
+            end (datetime or int): latest posting time, inclusive
+
+        Returns:
+            `range` of item ids, empty if no item was posted in between.
+
+        """
+        start, end = timestamp(start), timestamp(end)
+        if end < start:
+            return range(0)
+        max_item = self.get_max_item()
+        first = self._first_id_at(start, 1, max_item + 1, None, None)
+        last = self._first_id_at(end + 1, first, max_item + 1, None, None)
+        return range(first, last)
+
+    def get_items_between(self, start, end, item_type=None, chunk_size=1000,
+                          progress=None):
+        """Yields all items posted between `start` and `end`
+
+        Item ids grow with time, so the id range is found with a probing
+        binary/interpolation search, about 20 single item requests for a
+        one-day window, and only that range is then fetched, `chunk_size`
+        items per batch.
+
+        Args:
+            start (datetime or int): earliest posting time, inclusive
+            end (datetime or int): latest posting time, inclusive
+            item_type (str): (optional) Item type to filter results with
+            chunk_size (int): number of items fetched per batch
+            progress (obj): (optional) `Progress` object or callback, see
+                `get_items_by_ids`. Its total grows by one chunk at a time.
+
+        Returns:
+            generator of `Item` objects in increasing id order.
+
+        """
+        start, end = timestamp(start), timestamp(end)
+        between = self.get_ids_between(start, end)
+        progress = _as_progress(progress)
+        for offset in range(between.start, between.stop, chunk_size):
+            ids = range(offset, min(offset + chunk_size, between.stop))
+            for item in self.get_items_by_ids(
+                    ids, item_type=item_type, priority='bulk',
+                    progress=progress):
+                if start <= item.time.timestamp() <= end:
+                    yield item
+
+    def get_all(self, progress=None):
         """Returns ENTIRE Hacker News!
 
         Downloads all the HN articles and returns them as Item objects
 
+        Args:
+            progress (obj): (optional) `Progress` object or callback, see
+                `get_items_by_ids`.
+
         Returns:
             `list` object containing ids of HN stories.
 
         """
         max_item = self.get_max_item()
-        return self.get_last(num=max_item)
+        return self.get_last(num=max_item, progress=progress)
 
-    def get_last(self, num=10):
+    def get_last(self, num=10, progress=None):
         """Returns last `num` of HN stories
 
         Downloads all the HN articles and returns them as Item objects
 
+        Args:
+            num (int): number of most recent items
+            progress (obj): (optional) `Progress` object or callback, see
+                `get_items_by_ids`.
+
         Returns:
             `list` object containing ids of HN stories.
 
         """
         max_item = self.get_max_item()
-        urls = [urljoin(self.item_url, F"{i}.json") for i in range(
-            max_item - num + 1, max_item + 1)]
-        result = self._run_async(urls=urls)
-        return [Item(r) for r in result if r]
+        return self.get_items_by_ids(
+            range(max_item - num + 1, max_item + 1), priority='bulk',
+            progress=progress)
 
 
 class Item(object):
@@ -457,6 +1128,72 @@ class Item(object):
         return retval
 
 
+class BatchResult(list):
+
+    """
+    Objects fetched for a list of ids, in the order of the ids
+
+    The list holds the objects that were found. `results` is aligned with
+    `ids` and holds None where an id is missing, failed or filtered out.
+    `missing` holds the ids that do not exist (e.g. deleted users) and
+    `failed` the ids whose request failed, which are worth retrying.
+    """
+
+    def __init__(self, ids, fetch, make):
+        """
+
+        Args:
+            ids (list): ids to fetch
+            fetch (callable): takes a list of ids and a `failed` keyword
+                set, returns the raw responses in order and adds the ids
+                that failed to `failed`.
+            make (callable): turns a raw response into an object
+
+        """
+        super(BatchResult, self).__init__()
+        self.ids = ids
+        self.results = [None] * len(ids)
+        self.missing = set()
+        self.failed = set()
+        self._fetch = fetch
+        self._make = make
+        self._predicates = []
+        self._fill(range(len(ids)))
+
+    def _fill(self, indexes):
+        failed = set()
+        responses = self._fetch([self.ids[i] for i in indexes], failed=failed)
+        for index, response in zip(indexes, responses):
+            key = self.ids[index]
+            if response:
+                obj = self._make(response)
+                if all(predicate(obj) for predicate in self._predicates):
+                    self.results[index] = obj
+                self.failed.discard(key)
+            elif key in failed:
+                self.failed.add(key)
+            else:
+                self.failed.discard(key)
+                self.missing.add(key)
+        self[:] = [obj for obj in self.results if obj is not None]
+
+    def retry(self):
+        """Fetches the failed ids again, leaving the rest alone"""
+        indexes = [i for i, key in enumerate(self.ids) if key in self.failed]
+        if indexes:
+            self._fill(indexes)
+
+    def keep(self, predicate):
+        """Drops the objects for which `predicate` is false, now and on
+        later retries"""
+        self._predicates.append(predicate)
+        self.results = [
+            obj if obj is not None and predicate(obj) else None
+            for obj in self.results
+        ]
+        self[:] = [obj for obj in self.results if obj is not None]
+
+
 class User(object):
 
     """
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+"""
+Append-only, id-indexed archive of Hacker News items.
+
+An archive is two files:
+
+    <path>      records, each a 4 byte little-endian length followed by the
+                item's compact JSON, after an 8 byte magic header
+    <path>.idx  dense array of 8 byte little-endian offsets into <path>,
+                indexed by item id, where 0 means "not archived"
+
+Both files are read through `mmap`, so opening an archive costs nothing no
+matter how many items it holds and every lookup is O(1). Re-adding an item
+appends a new record and repoints the index, so the latest version wins.
+An archive can be shared between threads: appends, index writes and
+remapping are serialized by a lock.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import json
+import mmap
+import os
+import struct
+import threading
+
+from .utils import raw_json
+
+MAGIC = b'HAXORAR1'
+_LENGTH = struct.Struct('<I')
+_OFFSET = struct.Struct('<Q')
+_IDS_CHUNK = 65536 * _OFFSET.size
+
+
+class Archive(object):
+
+    """
+    Persistent item store backed by memory-mapped files
+    """
+
+    def __init__(self, path):
+        """
+
+        Args:
+            path (str): path of the record file. The index is kept next to
+                it with an `.idx` suffix. Both are created if missing.
+
+        """
+        self.path = path
+        self.index_path = path + '.idx'
+        self._data_map = None
+        self._index_map = None
+        self._lock = threading.RLock()
+        self._data = open(path, 'a+b', buffering=0)
+        self._index = os.fdopen(
+            os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o644),
+            'r+b', buffering=0)
+        if os.fstat(self._data.fileno()).st_size == 0:
+            self._data.write(MAGIC)
+        else:
+            self._data.seek(0)
+            if self._data.read(len(MAGIC)) != MAGIC:
+                self.close()
+                raise ValueError(F"{path} is not a haxor archive")
+
+    def _map(self, fileobj, current):
+        size = os.fstat(fileobj.fileno()).st_size
+        if current is not None and len(current) == size:
+            return current
+        if current is not None:
+            current.close()
+        if size == 0:
+            return None
+        return mmap.mmap(fileobj.fileno(), size, access=mmap.ACCESS_READ)
+
+    def _offset(self, item_id):
+        if item_id < 0:
+            return 0
+        position = item_id * _OFFSET.size
+        if (self._index_map is None or
+                position + _OFFSET.size > len(self._index_map)):
+            self._index_map = self._map(self._index, self._index_map)
+            if (self._index_map is None or
+                    position + _OFFSET.size > len(self._index_map)):
+                return 0
+        return _OFFSET.unpack_from(self._index_map, position)[0]
+
+    def get(self, item_id):
+        """Returns the archived JSON `dict` of an item, or None
+
+        Args:
+            item_id (int or string): item id to look up
+
+        """
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            offset = self._offset(item_id)
+            if not offset:
+                return None
+            if (self._data_map is None or
+                    offset + _LENGTH.size > len(self._data_map)):
+                self._data_map = self._map(self._data, self._data_map)
+            length = _LENGTH.unpack_from(self._data_map, offset)[0]
+            start = offset + _LENGTH.size
+            if start + length > len(self._data_map):
+                self._data_map = self._map(self._data, self._data_map)
+            record = self._data_map[start:start + length]
+        return json.loads(record)
+
+    def __contains__(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            return bool(self._offset(item_id))
+
+    def add(self, data):
+        """Appends one item
+
+        Args:
+            data (dict or `Item`): raw JSON `dict` of the item, or an
+                `Item` object whose `raw` JSON is stored.
+
+        """
+        self.extend([data])
+
+    def extend(self, items):
+        """Appends many items with a single write to the record file
+
+        Args:
+            items (iterable): raw JSON `dict` objects or `Item` objects
+
+        Raises:
+          ValueError: If an item's id is not a non-negative integer. Nothing
+            is written then.
+
+        """
+        chunk = bytearray()
+        positions = []
+        for data in items:
+            if data is None:
+                continue
+            data = raw_json(data)
+            item_id = data.get('id')
+            if (not isinstance(item_id, int) or isinstance(item_id, bool) or
+                    item_id < 0):
+                raise ValueError(F"invalid item id {item_id!r}")
+            body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            positions.append((item_id, len(chunk)))
+            chunk += _LENGTH.pack(len(body))
+            chunk += body
+        if not positions:
+            return
+        with self._lock:
+            offset = os.fstat(self._data.fileno()).st_size
+            self._data.write(chunk)
+            fd = self._index.fileno()
+            for item_id, position in positions:
+                os.pwrite(fd, _OFFSET.pack(offset + position),
+                          item_id * _OFFSET.size)
+
+    def ids(self):
+        """Yields archived item ids in increasing order"""
+        start = 0
+        while True:
+            # copy a slice of the index under the lock, so that it can be
+            # remapped while the caller consumes the ids
+            with self._lock:
+                self._index_map = self._map(self._index, self._index_map)
+                if self._index_map is None:
+                    return
+                chunk = self._index_map[start:start + _IDS_CHUNK]
+            if not chunk:
+                return
+            first = start // _OFFSET.size
+            for item_id, (offset,) in enumerate(
+                    _OFFSET.iter_unpack(chunk), first):
+                if offset:
+                    yield item_id
+            start += len(chunk)
+
+    def close(self):
+        """Unmaps and closes both files"""
+        with self._lock:
+            for mapped in (self._data_map, self._index_map):
+                if mapped is not None:
+                    mapped.close()
+            self._data_map = self._index_map = None
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return '<hackernews.Archive: {0}>'.format(self.path)
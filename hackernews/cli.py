@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+
+"""
+The `haxor` command line tool.
+
+    haxor crawl --start 1 --end 100000 -o items.jsonl.gz --checkpoint ck
+    haxor crawl --since 2024-01-01 --until 2024-01-02 --type story
+    haxor tail --interval 10 --format csv
+    haxor stories top --limit 30
+    haxor user pg dang
+
+Results are written one per line to stdout or to `--output`. Long crawls
+save their position to a `--checkpoint` file after every chunk, and resume
+from it (appending to the output) when run again with the same file.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import argparse
+import bz2
+import csv
+import datetime
+import gzip
+import io
+import json
+import lzma
+import os
+import sys
+import time
+
+from . import HackerNews
+from .archive import Archive
+from .concurrency import AdaptiveLimiter, Limiter
+from .progress import Progress
+from .utils import timestamp
+
+STORY_LISTS = ('top', 'new', 'ask', 'show', 'job')
+ITEM_FIELDS = ('id', 'type', 'by', 'time', 'parent', 'score', 'descendants',
+               'title', 'url', 'text', 'deleted', 'dead')
+USER_FIELDS = ('id', 'created', 'karma', 'about')
+COMPRESSORS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+
+def _time(value):
+    """Parses unix time or an ISO 8601 date/time (local unless it has an
+    offset) into unix time"""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return timestamp(datetime.datetime.fromisoformat(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(F"invalid time {value!r}")
+
+
+def _concurrency(value):
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            F"invalid concurrency {value!r}, expected a number or 'auto'")
+
+
+class Checkpoint(object):
+
+    """
+    JSON state file, replaced atomically on every save
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Returns the saved state, or None if nothing was saved yet"""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state):
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+
+class Output(object):
+
+    """
+    Writes items or users as JSON lines, CSV rows or into an `Archive`
+    """
+
+    def __init__(self, path='-', fmt='jsonl', compress=None, append=False,
+                 fields=ITEM_FIELDS):
+        """
+
+        Args:
+            path (str): file to write, `-` for stdout.
+            fmt (str): `jsonl`, `csv` or `archive`.
+            compress (str): (optional) `gzip`, `bz2` or `xz`. Guessed from
+                the extension of `path` if not given.
+            append (bool): add to an existing file instead of replacing it.
+            fields (tuple): CSV columns.
+
+        """
+        self.fmt = fmt
+        self._archive = None
+        self._csv = None
+        if fmt == 'archive':
+            if path == '-' or compress:
+                raise ValueError('archive output needs an uncompressed file')
+            self._archive = Archive(path)
+            self._file = None
+            return
+        if compress is None and path != '-':
+            compress = EXTENSIONS.get(os.path.splitext(path)[1])
+        mode = 'at' if append else 'wt'
+        if path == '-':
+            if compress:
+                self._file = io.TextIOWrapper(COMPRESSORS[compress](
+                    sys.stdout.buffer, mode[0] + 'b'), encoding='utf-8')
+            else:
+                self._file = sys.stdout
+        elif compress:
+            self._file = COMPRESSORS[compress](path, mode, encoding='utf-8')
+        else:
+            self._file = open(path, mode, encoding='utf-8')
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(
+                self._file, fields, extrasaction='ignore')
+            if not (append and path != '-' and os.path.getsize(path)):
+                self._csv.writeheader()
+
+    def write(self, obj):
+        """Writes an `Item` or `User`"""
+        if self._archive is not None:
+            self._archive.add(obj)
+        elif self._csv is not None:
+            self._csv.writerow(json.loads(obj.raw))
+        else:
+            self._file.write(obj.raw)
+            self._file.write('\n')
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+        elif self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def crawl(hn, args, output, checkpoint=None):
+    """Fetches an id range, or the items posted in a time range
+
+    Returns:
+        number of items that still failed after retries.
+
+    """
+    state = checkpoint.load() if checkpoint else None
+    if state is None:
+        if args.since is not None:
+            until = args.until if args.until is not None else time.time()
+            ids = hn.get_ids_between(args.since, until)
+            state = {'next': ids.start, 'stop': ids.stop,
+                     'since': args.since, 'until': timestamp(until)}
+        else:
+            end = args.end if args.end is not None else hn.get_max_item()
+            state = {'next': args.start, 'stop': end + 1}
+        state['failed'] = []
+    progress = Progress(_report) if args.progress else None
+
+    def fetch(ids):
+        batch = hn.get_items_by_ids(
+            ids, item_type=args.type, priority='bulk', retries=args.retries,
+            progress=progress)
+        for item in batch:
+            posted = item.time.timestamp()
+            if (state.get('since') is not None and
+                    not state['since'] <= posted <= state['until']):
+                continue
+            output.write(item)
+        output.flush()
+        return sorted(batch.failed)
+
+    # ids that failed in an earlier run get another chance first
+    if state['failed']:
+        state['failed'] = fetch(state['failed'])
+    while state['next'] < state['stop']:
+        ids = range(state['next'],
+                    min(state['next'] + args.chunk_size, state['stop']))
+        state['failed'] += fetch(ids)
+        state['next'] = ids.stop
+        if checkpoint:
+            checkpoint.save(state)
+    if checkpoint:
+        checkpoint.save(state)
+    if progress is not None:
+        progress.flush()
+        print(file=sys.stderr)
+    if state['failed']:
+        print(F"haxor: {len(state['failed'])} items failed", file=sys.stderr)
+    return len(state['failed'])
+
+
+def tail(hn, args, output, checkpoint=None):
+    """Polls for new items until `args.count` have been written, if given
+
+    Items that are not available yet when first seen are retried once on
+    the next poll.
+    """
+    state = checkpoint.load() if checkpoint else None
+    if state is None:
+        last = hn.get_max_item() if args.start is None else args.start - 1
+        state = {'last': last, 'pending': []}
+    written = 0
+    while True:
+        max_item = hn.get_max_item()
+        new = list(range(state['last'] + 1, max_item + 1))
+        batch = hn.get_items_by_ids(
+            state['pending'] + new, item_type=args.type, retries=args.retries)
+        for item in batch:
+            if args.count is not None and written >= args.count:
+                break
+            output.write(item)
+            written += 1
+        output.flush()
+        unavailable = batch.failed | batch.missing
+        state = {'last': max_item,
+                 'pending': [i for i in new if i in unavailable]}
+        if checkpoint:
+            checkpoint.save(state)
+        if args.count is not None and written >= args.count:
+            return 0
+        time.sleep(args.interval)
+
+
+def stories(hn, args, output, checkpoint=None):
+    """Writes the current items of a story list"""
+    for story in getattr(hn, F"{args.list}_stories")(limit=args.limit):
+        output.write(story)
+    return 0
+
+
+def users(hn, args, output, checkpoint=None):
+    """Writes users; returns the number of unknown ones"""
+    batch = hn.get_users_by_ids(args.user_ids, retries=args.retries)
+    for user in batch:
+        output.write(user)
+    for user_id in batch.ids:
+        if user_id in batch.missing or user_id in batch.failed:
+            print(F"haxor: could not fetch user {user_id}", file=sys.stderr)
+    return len(batch.missing | batch.failed)
+
+
+def _report(progress):
+    print(F"\r{progress!r}", end='', file=sys.stderr, flush=True)
+
+
+def parser():
+    """Returns the `argparse` parser of the `haxor` command"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '-c', '--concurrency', type=_concurrency, default=100,
+        help="maximum requests in flight, or 'auto' to adapt it to the "
+             "server (default: 100)")
+    common.add_argument(
+        '-r', '--rate', type=float,
+        help='maximum requests started per second')
+    common.add_argument(
+        '--retries', type=int, default=2,
+        help='retries of failed requests (default: 2)')
+    common.add_argument(
+        '-o', '--output', default='-',
+        help='output file (default: stdout)')
+    common.add_argument(
+        '-f', '--format', choices=('jsonl', 'csv', 'archive'),
+        default='jsonl', help='output format (default: jsonl)')
+    common.add_argument(
+        '-z', '--compress', choices=sorted(COMPRESSORS),
+        help='compress the output, guessed from its extension if not given')
+
+    resumable = argparse.ArgumentParser(add_help=False)
+    resumable.add_argument(
+        '--checkpoint',
+        help='state file to resume from and save progress to')
+    resumable.add_argument(
+        '--type', choices=('story', 'comment', 'job', 'poll', 'pollopt'),
+        help='only write items of this type')
+
+    main_parser = argparse.ArgumentParser(
+        prog='haxor', description='Fetch data from the Hacker News API.')
+    commands = main_parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    crawl_parser = commands.add_parser(
+        'crawl', parents=[common, resumable],
+        help='fetch a range of items by id or posting time')
+    crawl_parser.add_argument(
+        '--start', type=int, default=1, help='first item id (default: 1)')
+    crawl_parser.add_argument(
+        '--end', type=int, help='last item id (default: newest item)')
+    crawl_parser.add_argument(
+        '--since', type=_time,
+        help='earliest posting time, unix time or ISO 8601')
+    crawl_parser.add_argument(
+        '--until', type=_time,
+        help='latest posting time, unix time or ISO 8601 (default: now)')
+    crawl_parser.add_argument(
+        '--chunk-size', type=int, default=1000,
+        help='items fetched between checkpoints (default: 1000)')
+    crawl_parser.add_argument(
+        '--progress', action='store_true',
+        help='report progress on stderr')
+    crawl_parser.set_defaults(handler=crawl)
+
+    tail_parser = commands.add_parser(
+        'tail', parents=[common, resumable], help='follow new items')
+    tail_parser.add_argument(
+        '--start', type=int, help='first item id (default: the next one)')
+    tail_parser.add_argument(
+        '--interval', type=float, default=5.0,
+        help='seconds between polls (default: 5)')
+    tail_parser.add_argument(
+        '-n', '--count', type=int, help='stop after this many items')
+    tail_parser.set_defaults(handler=tail)
+
+    stories_parser = commands.add_parser(
+        'stories', parents=[common], help='fetch a story list')
+    stories_parser.add_argument('list', choices=STORY_LISTS)
+    stories_parser.add_argument(
+        '-l', '--limit', type=int, help='number of stories')
+    stories_parser.set_defaults(handler=stories)
+
+    user_parser = commands.add_parser(
+        'user', parents=[common], help='fetch users')
+    user_parser.add_argument('user_ids', nargs='+', metavar='user_id')
+    user_parser.set_defaults(handler=users, fields=USER_FIELDS)
+    return main_parser
+
+
+def main(argv=None, client=HackerNews):
+    """Runs the `haxor` command
+
+    Args:
+        argv (list): arguments, `sys.argv[1:]` if not given.
+        client (type): `HackerNews` class to use.
+
+    Returns:
+        exit status.
+
+    """
+    args = parser().parse_args(argv)
+    if args.concurrency == 'auto':
+        limiter = AdaptiveLimiter(rate=args.rate)
+    else:
+        limiter = Limiter(args.concurrency, rate=args.rate)
+    checkpoint = None
+    if getattr(args, 'checkpoint', None):
+        checkpoint = Checkpoint(args.checkpoint)
+    resuming = checkpoint is not None and os.path.exists(checkpoint.path)
+    if args.format == 'archive' and args.command == 'user':
+        parser().error('archive output holds items only')
+    try:
+        output = Output(
+            args.output, args.format, args.compress, append=resuming,
+            fields=getattr(args, 'fields', ITEM_FIELDS))
+    except (OSError, ValueError) as e:
+        parser().error(str(e))
+    hn = client(concurrency=limiter)
+    try:
+        return 1 if args.handler(hn, args, output, checkpoint) else 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        output.close()
+        hn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+"""
+Concurrency control for the async fetch path.
+
+`Limiter` caps the number of requests in flight and dispatches waiting
+requests by priority lane: `interactive` first, then `normal`, then `bulk`.
+Part of the cap is reserved for the higher lanes, and lower lanes get no new
+slots while a higher lane is waiting, so a long crawl cannot starve
+interactive lookups.
+
+Both can also cap the request rate, spacing request starts evenly.
+
+`AdaptiveLimiter` moves the cap with AIMD: it grows additively while
+requests are healthy and is cut multiplicatively on timeouts, 429s, 5xxs or
+a rising p99 latency.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import collections
+import time
+
+PRIORITIES = ('interactive', 'normal', 'bulk')
+
+
+def percentile(values, fraction):
+    """Returns the `fraction` percentile (0..1) of a non-empty sequence"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+class Limiter(object):
+
+    """
+    Caps the number of requests in flight on an event loop
+    """
+
+    def __init__(self, limit=100, reserved=None, rate=None):
+        """
+
+        Args:
+            limit (int): maximum number of requests in flight.
+            reserved (dict): fraction of `limit` held back for each lane,
+                usable only by that lane and the lanes above it. Defaults
+                to 10% for `interactive` and 10% for `normal`.
+            rate (float): (optional) maximum number of requests started
+                per second.
+
+        """
+        self.limit = limit
+        self.maximum = limit
+        self.in_flight = 0
+        if reserved is None:
+            reserved = {'interactive': 0.1, 'normal': 0.1}
+        self.reserved = reserved
+        self.rate = rate
+        self._next_start = 0.0
+        self._waiters = {lane: collections.deque() for lane in PRIORITIES}
+
+    def _capacity(self, lane):
+        held_back = 0.0
+        for higher in PRIORITIES[:PRIORITIES.index(lane)]:
+            held_back += self.reserved.get(higher, 0.0)
+        return max(1, int(self.limit * (1.0 - held_back)))
+
+    def _waiting(self, lane):
+        """Whether requests of `lane` or a higher lane are queued"""
+        for higher in PRIORITIES[:PRIORITIES.index(lane) + 1]:
+            if self._waiters[higher]:
+                return True
+        return False
+
+    def _wake(self):
+        for lane in PRIORITIES:
+            waiters = self._waiters[lane]
+            while waiters and self.in_flight < self._capacity(lane):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    waiter.set_result(None)
+            if waiters:
+                return
+
+    async def acquire(self, priority='normal'):
+        """Waits for a free slot and takes it
+
+        Args:
+            priority (str): lane of the request, one of `interactive`,
+                `normal` or `bulk`.
+
+        """
+        import asyncio
+        await self._take(priority)
+        if self.rate:
+            try:
+                await self._pace()
+            except asyncio.CancelledError:
+                self.in_flight -= 1
+                self._wake()
+                raise
+
+    async def _pace(self):
+        """Waits for the next start time allowed by `rate`"""
+        import asyncio
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1.0 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _take(self, priority):
+        import asyncio
+        if (not self._waiting(priority) and
+                self.in_flight < self._capacity(priority)):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+            elif waiter in self._waiters[priority]:
+                self._waiters[priority].remove(waiter)
+            self._wake()
+            raise
+
+    def release(self, latency=None, failed=False, started=None):
+        """Frees a slot
+
+        Args:
+            latency (float): seconds the request took, or None if it did
+                not complete (e.g. it was cancelled).
+            failed (bool): whether the request failed in a way that points
+                at server overload: a timeout, connection error, 429 or 5xx.
+            started (float): (optional) `time.monotonic()` when the request
+                was sent. Taken to be `latency` seconds ago if not given.
+
+        """
+        self.in_flight -= 1
+        self._wake()
+
+    def __repr__(self):
+        return '<hackernews.{0}: {1}/{2:g}>'.format(
+            type(self).__name__, self.in_flight, self.limit)
+
+
+class AdaptiveLimiter(Limiter):
+
+    """
+    Limiter whose cap follows AIMD on request outcomes and latency
+    """
+
+    def __init__(self, initial=10, minimum=1, maximum=500, increase=1.0,
+                 backoff=0.5, latency_tolerance=2.0, window=200,
+                 reserved=None, rate=None):
+        """
+
+        Args:
+            initial (int): starting in-flight limit.
+            minimum (int): the limit never goes below this.
+            maximum (int): the limit never goes above this.
+            increase (float): how much the limit grows per `limit`
+                successful requests, i.e. per round trip.
+            backoff (float): factor the limit is multiplied by on overload.
+            latency_tolerance (float): cut the limit when a window's p99
+                latency exceeds the baseline p99 by this factor.
+            window (int): number of latencies per p99 sample.
+            reserved (dict): capacity held back per lane, see `Limiter`.
+            rate (float): (optional) maximum requests started per second.
+
+        """
+        super(AdaptiveLimiter, self).__init__(initial, reserved, rate)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self.p99 = None
+        self.baseline_p99 = None
+        self.decreases = 0
+        self._latencies = []
+        self._last_decrease = float('-inf')
+
+    def _decrease(self, started=None):
+        # Requests already in flight when the limit was cut report their
+        # outcome afterwards, so only requests sent after the last cut
+        # cut it again.
+        if started is not None and started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.decreases += 1
+
+    def _observe(self, latency):
+        self._latencies.append(latency)
+        if len(self._latencies) < self.window:
+            return False
+        self.p99 = percentile(self._latencies, 0.99)
+        self._latencies = []
+        if self.baseline_p99 is None:
+            self.baseline_p99 = self.p99
+            return False
+        rising = self.p99 > self.baseline_p99 * self.latency_tolerance
+        # Let the baseline drift upwards slowly, so that a permanently
+        # slower server does not keep the limit pinned down.
+        self.baseline_p99 = min(self.p99, self.baseline_p99 * 1.05)
+        return rising
+
+    def release(self, latency=None, failed=False, started=None):
+        if started is None and latency is not None:
+            started = time.monotonic() - latency
+        if failed:
+            self._decrease(started)
+        elif latency is not None:
+            if self._observe(latency):
+                self._decrease(started)
+            else:
+                self.limit = min(
+                    self.maximum, self.limit + self.increase / self.limit)
+        super(AdaptiveLimiter, self).release(latency, failed, started)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+"""
+Connection settings of the client.
+
+`ConnectionPolicy` builds the aiohttp connector: certificates are verified
+against the system CA store with a TLS context shared by all clients, DNS
+results are cached, and idle connections are kept alive so that later
+batches reuse warm connections instead of paying for a new handshake.
+TLS sessions are not resumed across connections, so `HackerNews.warmup`
+is the way to have handshakes done before a batch starts. Requests of
+both the sync and the async path fail after `timeout` seconds.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import threading
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+
+def ssl_context(cafile=None):
+    """Returns a verifying client `ssl.SSLContext`, shared per `cafile`
+
+    Loading the CA store is slow, so one context is reused by every
+    connection and client.
+    """
+    with _contexts_lock:
+        context = _contexts.get(cafile)
+        if context is None:
+            import ssl
+            context = ssl.create_default_context(cafile=cafile)
+            _contexts[cafile] = context
+        return context
+
+
+class ConnectionPolicy(object):
+
+    """
+    How the client connects: TLS, DNS caching, keep-alive and timeouts
+    """
+
+    def __init__(self, verify=True, cafile=None, dns_ttl=300,
+                 keepalive=60.0, limit_per_host=0, timeout=30.0):
+        """
+
+        Args:
+            verify (bool): verify server certificates. Only turn this off
+                for local test servers.
+            cafile (str): (optional) CA bundle to verify against instead
+                of the system store.
+            dns_ttl (int): seconds DNS results are cached, None to cache
+                them for the lifetime of the session.
+            keepalive (float): seconds idle connections are kept open.
+            limit_per_host (int): maximum connections per host, 0 for no
+                limit beyond the client's concurrency.
+            timeout (float): seconds a request may take, connecting
+                included, before it fails; None for no limit. A timed out
+                async request counts as a failure for `AdaptiveLimiter`.
+
+        """
+        self.verify = verify
+        self.cafile = cafile
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+
+    def connector(self, limit):
+        """Returns a new `aiohttp.TCPConnector` with at most `limit`
+        connections; must be called on the loop that will use it"""
+        import aiohttp
+        return aiohttp.TCPConnector(
+            ssl=ssl_context(self.cafile) if self.verify else False,
+            limit=limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive,
+        )
+
+    def client_timeout(self):
+        """Returns the `aiohttp.ClientTimeout` of async requests"""
+        import aiohttp
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    def __repr__(self):
+        return '<hackernews.ConnectionPolicy: verify={0}, dns_ttl={1}, ' \
+            'keepalive={2}, timeout={3}>'.format(
+                self.verify, self.dns_ttl, self.keepalive, self.timeout)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+"""
+Latency histograms and request hedging.
+
+A hedged request sends a duplicate when the original has not completed by a
+latency percentile of recent requests, and takes whichever response comes
+back first. A token budget keeps the number of duplicates to a fixed
+fraction of all requests.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import math
+
+
+class LatencyHistogram(object):
+
+    """
+    Log-bucketed latency histogram with cheap recording and percentiles
+    """
+
+    def __init__(self, minimum=0.001, growth=1.1, buckets=160):
+        """
+
+        Args:
+            minimum (float): upper bound in seconds of the first bucket.
+            growth (float): ratio between the bounds of adjacent buckets,
+                i.e. the relative precision of the percentiles.
+            buckets (int): number of buckets. The last one also holds every
+                latency beyond the others, ~1 hour with the defaults.
+
+        """
+        self.minimum = minimum
+        self.growth = growth
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self._log_growth = math.log(growth)
+
+    def record(self, seconds):
+        """Adds a latency in seconds"""
+        if seconds <= self.minimum:
+            index = 0
+        else:
+            index = int(math.ceil(
+                math.log(seconds / self.minimum) / self._log_growth))
+            index = min(index, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, fraction):
+        """Returns the `fraction` percentile (0..1) in seconds, or None if
+        nothing was recorded. The value is the upper bound of its bucket."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.minimum * self.growth ** index
+        return self.minimum * self.growth ** (len(self.counts) - 1)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def decay(self):
+        """Halves all counts, so that recent latencies weigh more"""
+        self.counts = [count // 2 for count in self.counts]
+        self.count = sum(self.counts)
+        self.total /= 2.0
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+
+    def __repr__(self):
+        if not self.count:
+            return '<hackernews.LatencyHistogram: empty>'
+        return '<hackernews.LatencyHistogram: n={0} p50={1:.3f}s ' \
+            'p99={2:.3f}s>'.format(
+                self.count, self.percentile(0.5), self.percentile(0.99))
+
+
+class HedgePolicy(object):
+
+    """
+    When to send a duplicate request, and how many of them
+    """
+
+    def __init__(self, percentile=0.95, budget=0.05, min_samples=100,
+                 window=10000):
+        """
+
+        Args:
+            percentile (float): hedge requests still running after this
+                percentile (0..1) of recent request latencies.
+            budget (float): maximum number of hedges per request, e.g.
+                0.05 bounds the extra load at 5%.
+            min_samples (int): no hedging until this many latencies are
+                known.
+            window (int): halve the latency history every `window`
+                requests, so the threshold follows the server.
+
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+        self._tokens = 0.0
+
+    def delay(self):
+        """Counts a new request and returns after how many seconds it
+        should be hedged, or None if it should not be"""
+        self.requests += 1
+        self._tokens = min(self._tokens + self.budget, 10.0)
+        if self.latency.count < self.min_samples:
+            return None
+        return self.latency.percentile(self.percentile)
+
+    def allow(self):
+        """Takes a hedge from the budget, returns False if it is spent"""
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        self.hedges += 1
+        return True
+
+    def observe(self, seconds):
+        """Records the latency of a completed request"""
+        self.latency.record(seconds)
+        if self.latency.count >= self.window:
+            self.latency.decay()
+
+    def __repr__(self):
+        return '<hackernews.HedgePolicy: {0} hedges, {1} won, ' \
+            '{2} requests>'.format(self.hedges, self.wins, self.requests)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+"""
+Lazy, batched resolution of Hacker News references.
+
+A `Loader` hands out `Ref` handles for ids without fetching anything. Ids
+are queued on a `Queue`, e.g. one per batch of items the handles were made
+for. The first time any handle is read, the ids queued with it are fetched
+in a single deduplicated batch, the way DataLoader does it. A queue holds
+at most `max_batch` ids, later ones start a new batch.
+
+Fetched objects are cached for `ttl` seconds, at most `max_entries` of them,
+so long-lived clients neither grow without bound nor keep stale scores and
+karma. Ids whose request failed are not cached and are asked for again.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import collections
+import threading
+import time
+
+
+class Queue(object):
+
+    """
+    Ids whose handles were created together and are fetched together
+    """
+
+    __slots__ = ('pending',)
+
+    def __init__(self):
+        self.pending = {}
+
+
+class Loader(object):
+
+    """
+    Collects ids and resolves them with one batch call per dispatch
+    """
+
+    def __init__(self, batch_fn, key_fn, max_entries=10000, ttl=300.0,
+                 max_batch=1000):
+        """
+
+        Args:
+            batch_fn (callable): takes a list of ids and returns the
+                fetched objects, in any order. Ids with no result are
+                simply left out. If the result has a `failed` set, like
+                `BatchResult`, those ids are not cached.
+            key_fn (callable): returns the id of a fetched object.
+            max_entries (int): maximum number of ids cached, least
+                recently used first out.
+            ttl (float): seconds an id stays cached, None for no expiry.
+            max_batch (int): maximum number of ids fetched per batch.
+
+        """
+        self._batch_fn = batch_fn
+        self._key_fn = key_fn
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_batch = max_batch
+        self._cache = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def _cached(self, key):
+        """Whether `key` is cached and has not expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return False
+        if self.ttl is not None and entry[0] < time.monotonic():
+            del self._cache[key]
+            return False
+        self._cache.move_to_end(key)
+        return True
+
+    def _remember(self, key, obj, expires):
+        self._cache[key] = (expires, obj)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def load(self, key, queue=None):
+        """Returns a `Ref` for `key` and queues the key on `queue`
+
+        Args:
+            key (obj): id to load.
+            queue (obj): (optional) `Queue` shared with the handles to be
+                fetched in the same batch. The key is fetched on its own
+                if not given.
+
+        """
+        if queue is None:
+            queue = Queue()
+        with self._lock:
+            if not self._cached(key):
+                if len(queue.pending) >= self.max_batch:
+                    queue.pending = {}
+                queue.pending[key] = None
+            return Ref(self, key, queue.pending)
+
+    def load_many(self, keys, queue=None):
+        """Returns a list of `Ref` objects, one per key, in order"""
+        if queue is None:
+            queue = Queue()
+        return [self.load(key, queue) for key in keys]
+
+    def get(self, key, pending=None):
+        """Returns the object for `key`, fetching it together with the
+        `pending` ids it was queued with if needed"""
+        with self._lock:
+            if not self._cached(key):
+                if pending is None:
+                    pending = {}
+                pending[key] = None
+                # read from the batch, the cache may be too small to hold it
+                return self.dispatch(pending).get(key)
+            return self._cache[key][1]
+
+    def prime(self, key, obj):
+        """Caches `obj`, fetched elsewhere, as the object for `key`, so
+        queued handles of `key` do not fetch it again"""
+        expires = (time.monotonic() + self.ttl
+                   if self.ttl is not None else None)
+        with self._lock:
+            self._remember(key, obj, expires)
+
+    def resolved(self, key):
+        """Whether `key` has been fetched already"""
+        with self._lock:
+            return self._cached(key)
+
+    def dispatch(self, pending):
+        """Fetches the `pending` ids that are not cached in a single batch
+        and empties `pending`
+
+        Returns:
+            `dict` of the fetched objects by id.
+
+        """
+        with self._lock:
+            keys = [k for k in pending if not self._cached(k)]
+            pending.clear()
+            if not keys:
+                return {}
+            objects = self._batch_fn(keys)
+            expires = (time.monotonic() + self.ttl
+                       if self.ttl is not None else None)
+            failed = getattr(objects, 'failed', ())
+            for key in keys:
+                if key not in failed:
+                    self._remember(key, None, expires)
+            fetched = {self._key_fn(obj): obj for obj in objects}
+            for key, obj in fetched.items():
+                self._remember(key, obj, expires)
+            return fetched
+
+    def clear(self):
+        """Forgets all fetched objects"""
+        with self._lock:
+            self._cache.clear()
+
+
+class Ref(object):
+
+    """
+    Lazy handle to an item or a user, resolved on first attribute access
+    """
+
+    __slots__ = ('_loader', 'key', '_pending')
+
+    def __init__(self, loader, key, pending=None):
+        self._loader = loader
+        self.key = key
+        self._pending = pending
+
+    @property
+    def value(self):
+        """The referenced object, or None if it does not exist"""
+        return self._loader.get(self.key, self._pending)
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in Ref.__slots__:
+            raise AttributeError(name)
+        value = self.value
+        if value is None:
+            raise AttributeError(name)
+        return getattr(value, name)
+
+    def __eq__(self, other):
+        if isinstance(other, Ref):
+            return self.key == other.key
+        return self.key == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        if self._loader.resolved(self.key):
+            return repr(self.value)
+        return '<hackernews.Ref: {0} (pending)>'.format(self.key)
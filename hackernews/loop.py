@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+"""
+Long-lived asyncio event loop running on a background thread.
+
+The synchronous API hands its async work to this loop instead of spinning
+one up per call, so any number of threads can share a single client, its
+loop and its connection pool. `asyncio` is only imported once the loop is
+started.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import threading
+
+
+class EventLoopThread(object):
+
+    """
+    Event loop on a daemon thread, with thread-safe submission
+    """
+
+    def __init__(self, name='haxor-event-loop'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """The running loop, started on first use and after a fork"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                import asyncio
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(
+                    target=self._serve, args=(loop, ready),
+                    name=self.name, daemon=True
+                )
+                thread.start()
+                ready.wait()
+                self._loop, self._thread = loop, thread
+                self._pid = os.getpid()
+            return self._loop
+
+    def _serve(self, loop, ready):
+        import asyncio
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def submit(self, coro):
+        """Schedules `coro` on the loop from any thread
+
+        Returns:
+            `concurrent.futures.Future` of the coroutine's result.
+
+        """
+        import asyncio
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError('cannot block on the event loop thread')
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro):
+        """Runs `coro` on the loop and blocks until it returns"""
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self, coro=None):
+        """Stops the loop and joins its thread
+
+        Args:
+            coro (coroutine): (optional) cleanup to run on the loop before
+                it stops.
+
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            alive = loop is not None and self._pid == os.getpid()
+            self._loop = self._thread = self._pid = None
+        if not alive:
+            if coro is not None:
+                coro.close()
+            return
+        if threading.current_thread() is thread:
+            # e.g. a client collected by a callback on its own loop, which
+            # cannot wait for itself
+            if coro is None:
+                loop.stop()
+            else:
+                loop.create_task(coro).add_done_callback(
+                    lambda task: loop.stop())
+            return
+        if coro is not None:
+            import asyncio
+            asyncio.run_coroutine_threadsafe(coro, loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""
+Speculative prefetching of comments for story lists.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+
+class PrefetchPolicy(object):
+
+    """
+    What to fetch in the background after a story list is returned
+    """
+
+    def __init__(self, kids=10, max_items=1000, max_entries=10000,
+                 max_bytes=16 * 1024 * 1024, ttl=60.0):
+        """
+
+        Args:
+            kids (int): number of first-level comments prefetched per story.
+            max_items (int): maximum number of comments prefetched per
+                story list.
+            max_entries (int): entry budget of the client's cache of
+                prefetched comments.
+            max_bytes (int): byte budget of that cache.
+            ttl (float): seconds a prefetched comment is served from the
+                cache before it is fetched again.
+
+        """
+        self.kids = kids
+        self.max_items = max_items
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prefetched = 0
+        self.cancelled = 0
+
+    def ids(self, stories, skip=None):
+        """Returns the comment ids to prefetch for `stories`
+
+        Args:
+            stories (list): `Item` objects of a story list
+            skip (obj): (optional) container of ids that need no fetching
+
+        """
+        ids = []
+        for story in stories:
+            for kid in (story.kids or [])[:self.kids]:
+                kid = getattr(kid, 'key', kid)
+                if skip is not None and kid in skip:
+                    continue
+                ids.append(kid)
+                if len(ids) >= self.max_items:
+                    return ids
+        return ids
+
+    def __repr__(self):
+        return '<hackernews.PrefetchPolicy: {0} prefetched, {1} ' \
+            'cancelled>'.format(self.prefetched, self.cancelled)
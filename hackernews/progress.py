@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""
+Progress reporting for long-running bulk fetches.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import collections
+import time
+
+
+class Progress(object):
+
+    """
+    Counters of a bulk fetch, with throughput and ETA
+
+    The counters are plain attributes that can be polled from any thread at
+    any time. `callback`, if given, is called with the `Progress` object at
+    most once per `interval` seconds, and once more when a batch ends.
+    Recording a completed request is a few additions, so it costs next to
+    nothing per item.
+    """
+
+    def __init__(self, callback=None, interval=1.0, smoothing=0.3):
+        """
+
+        Args:
+            callback (callable): (optional) called with this object as
+                progress is made.
+            interval (float): minimum seconds between callback calls, and
+                between throughput updates.
+            smoothing (float): weight of the latest interval in the moving
+                average of the request rate.
+
+        """
+        self.callback = callback
+        self.interval = interval
+        self.smoothing = smoothing
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.errors = collections.Counter()
+        self.rate = 0.0
+        self.started = time.monotonic()
+        self._mark_time = self.started
+        self._mark_completed = 0
+
+    def expect(self, count):
+        """Adds `count` requests to the expected total"""
+        self.total += count
+
+    def update(self, nbytes=0, error=None, count=1):
+        """Records `count` completed requests
+
+        Args:
+            nbytes (int): size of the response body
+            error (str): (optional) kind of failure, e.g. an HTTP status
+                or an exception name, if the request failed.
+            count (int): number of requests completed.
+
+        """
+        self.completed += count
+        self.bytes += nbytes
+        if error is not None:
+            self.failed += count
+            self.errors[error] += count
+        now = time.monotonic()
+        if now - self._mark_time >= self.interval:
+            self._tick(now)
+
+    def _tick(self, now):
+        elapsed = now - self._mark_time
+        if elapsed > 0:
+            current = (self.completed - self._mark_completed) / elapsed
+            if self.rate:
+                self.rate += self.smoothing * (current - self.rate)
+            else:
+                self.rate = current
+        self._mark_time = now
+        self._mark_completed = self.completed
+        if self.callback is not None:
+            self.callback(self)
+
+    def flush(self):
+        """Updates the rate and calls the callback right away"""
+        self._tick(time.monotonic())
+
+    @property
+    def elapsed(self):
+        """Seconds since the `Progress` was created"""
+        return time.monotonic() - self.started
+
+    @property
+    def eta(self):
+        """Estimated seconds until all expected requests are done, or None
+        if the rate is not known yet"""
+        remaining = max(0, self.total - self.completed)
+        if not remaining:
+            return 0.0
+        if not self.rate:
+            return None
+        return remaining / self.rate
+
+    def snapshot(self):
+        """Returns the current counters as a `dict`"""
+        return {
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'errors': dict(self.errors),
+            'rate': self.rate,
+            'elapsed': self.elapsed,
+            'eta': self.eta,
+        }
+
+    def __repr__(self):
+        eta = self.eta
+        return '<hackernews.Progress: {0}/{1} done, {2} failed, ' \
+            '{3:.1f} req/s, ETA {4}>'.format(
+                self.completed, self.total, self.failed, self.rate,
+                'unknown' if eta is None else '{0:.0f}s'.format(eta))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+"""
+Local full-text search over fetched Hacker News items.
+
+The index is an SQLite FTS5 table of item titles and texts, next to a plain
+table of item type, author and time used for filtering. Both live in one
+SQLite file, so the index persists and is updated in place as items are
+added again.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import html
+import re
+import sqlite3
+import threading
+
+from .utils import raw_json, timestamp
+
+_TAGS = re.compile(r'<[^>]+>')
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+# ids per membership query, below SQLite's default limit of 999 variables
+_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    type TEXT,
+    by TEXT,
+    time INTEGER
+);
+CREATE INDEX IF NOT EXISTS items_by ON items (by);
+CREATE INDEX IF NOT EXISTS items_time ON items (time);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_text USING fts5 (
+    title, text, tokenize = 'unicode61'
+);
+"""
+
+
+def _plain(text):
+    """Strips HTML markup and entities from item text"""
+    if not text:
+        return ''
+    return html.unescape(_TAGS.sub(' ', text))
+
+
+def _match_expression(query):
+    """Turns a user query into an FTS5 MATCH expression
+
+    Bare words are terms and double-quoted runs are phrases. Every term and
+    phrase must match.
+
+    """
+    parts = []
+    for phrase, term in _QUERY.findall(query):
+        words = (phrase or term).replace('"', ' ').split()
+        if words:
+            parts.append('"{0}"'.format(' '.join(words)))
+    return ' AND '.join(parts)
+
+
+class SearchIndex(object):
+
+    """
+    Inverted index over item titles and texts
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+
+        Args:
+            path (str): SQLite file the index is kept in. Defaults to an
+                in-memory index.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def add(self, data):
+        """Indexes a single item, replacing any previous version of it"""
+        self.extend([data])
+
+    def extend(self, items):
+        """Indexes many items in one transaction
+
+        Args:
+            items (iterable): raw JSON `dict` objects or `Item` objects.
+                Items already in the index are re-indexed.
+
+        """
+        rows = []
+        for data in items:
+            if data is None:
+                continue
+            data = raw_json(data)
+            rows.append((
+                int(data['id']), data.get('type'), data.get('by'),
+                data.get('time'), _plain(data.get('title')),
+                _plain(data.get('text'))
+            ))
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                'DELETE FROM items_text WHERE rowid = ?',
+                [(row[0],) for row in rows]
+            )
+            self._db.executemany(
+                'INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?)',
+                [row[:4] for row in rows]
+            )
+            self._db.executemany(
+                'INSERT INTO items_text (rowid, title, text) VALUES (?, ?, ?)',
+                [(row[0], row[4], row[5]) for row in rows]
+            )
+
+    def search(self, query, item_type=None, by=None, start=None, end=None,
+               limit=100, order='rank'):
+        """Returns ids of items matching `query`
+
+        Args:
+            query (str): words to match. Double-quoted words are matched
+                as a phrase, e.g. `python "type hints"`.
+            item_type (str): (optional) only return items of this type
+            by (str): (optional) only return items by this author
+            start (datetime or int): (optional) earliest item time
+            end (datetime or int): (optional) latest item time
+            limit (int): maximum number of ids to return
+            order (str): `rank` for best matches first, `time` for newest
+                first.
+
+        Returns:
+            `list` of matching item ids.
+
+        """
+        expression = _match_expression(query)
+        if not expression:
+            return []
+        sql = [
+            'SELECT items.id FROM items_text',
+            'JOIN items ON items.id = items_text.rowid',
+            'WHERE items_text MATCH ?'
+        ]
+        params = [expression]
+        if item_type:
+            sql.append('AND items.type = ?')
+            params.append(item_type)
+        if by:
+            sql.append('AND items.by = ?')
+            params.append(by)
+        if start is not None:
+            sql.append('AND items.time >= ?')
+            params.append(timestamp(start))
+        if end is not None:
+            sql.append('AND items.time <= ?')
+            params.append(timestamp(end))
+        if order == 'time':
+            sql.append('ORDER BY items.time DESC')
+        else:
+            sql.append('ORDER BY items_text.rank')
+        sql.append('LIMIT ?')
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(' '.join(sql), params).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT count(*) FROM items').fetchone()[0]
+
+    def missing(self, item_ids):
+        """Returns the `set` of `item_ids` that are not indexed"""
+        item_ids = [int(item_id) for item_id in item_ids]
+        found = set()
+        with self._lock:
+            for i in range(0, len(item_ids), _CHUNK):
+                chunk = item_ids[i:i + _CHUNK]
+                found.update(row[0] for row in self._db.execute(
+                    'SELECT id FROM items WHERE id IN ({0})'.format(
+                        ','.join('?' * len(chunk))), chunk))
+        return set(item_ids) - found
+
+    def __contains__(self, item_id):
+        with self._lock:
+            return self._db.execute(
+                'SELECT 1 FROM items WHERE id = ?', (item_id,)
+            ).fetchone() is not None
+
+    def close(self):
+        """Closes the underlying SQLite database"""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return '<hackernews.SearchIndex: {0}>'.format(self.path)
@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+
+"""
+In-memory item stores.
+
+Any object with `get(item_id)`, `add(data)` and `extend(items)` can be given
+to `HackerNews` as its `store`, like `Archive` on disk. `MemoryStore` is a
+bounded LRU cache of raw item JSON. `CompressedStore` keeps large working
+sets as compressed blocks of records.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import array
+import bisect
+import collections
+import json
+import sys
+import threading
+import time
+import zlib
+
+from .utils import raw_json
+
+
+class MemoryStore(object):
+
+    """
+    LRU item store bounded by entry count and bytes of JSON
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, ttl=None):
+        """
+
+        Args:
+            max_entries (int): maximum number of items kept.
+            max_bytes (int): (optional) maximum total size of the items'
+                JSON encoding.
+            ttl (float): (optional) seconds an item is served after it was
+                stored. Items are kept until evicted by default.
+
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, item_id):
+        """Returns the stored JSON `dict` of an item, or None"""
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None:
+                return None
+            expires, encoded = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[item_id]
+                self.nbytes -= len(encoded)
+                return None
+            self._entries.move_to_end(item_id)
+        return json.loads(encoded)
+
+    def add(self, data):
+        """Stores one item, evicting the least recently used if needed"""
+        self.extend([data])
+
+    def extend(self, items):
+        """Stores many items
+
+        Args:
+            items (iterable): raw JSON `dict` objects or `Item` objects
+
+        """
+        for data in items:
+            if data is None:
+                continue
+            data = raw_json(data)
+            encoded = json.dumps(data, separators=(',', ':'))
+            item_id = int(data['id'])
+            expires = None
+            if self.ttl is not None:
+                expires = time.monotonic() + self.ttl
+            with self._lock:
+                previous = self._entries.pop(item_id, None)
+                if previous is not None:
+                    self.nbytes -= len(previous[1])
+                self._entries[item_id] = (expires, encoded)
+                self.nbytes += len(encoded)
+                self._evict()
+
+    def _evict(self):
+        while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and
+                 self.nbytes > self.max_bytes)):
+            _, (_, encoded) = self._entries.popitem(last=False)
+            self.nbytes -= len(encoded)
+
+    def __contains__(self, item_id):
+        try:
+            entry = self._entries.get(int(item_id))
+        except (TypeError, ValueError):
+            return False
+        return entry is not None and (
+            entry[0] is None or entry[0] > time.monotonic())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __repr__(self):
+        return '<hackernews.MemoryStore: {0} items, {1} bytes>'.format(
+            len(self), self.nbytes)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("codec 'zstd' needs the zstandard package")
+    return zstandard
+
+
+def train_dictionary(items, size=32 * 1024, codec='zlib'):
+    """Builds a shared compression dictionary from sample items
+
+    Args:
+        items (iterable): sample raw JSON `dict` objects or `Item` objects,
+            ideally a few thousand recent ones.
+        size (int): dictionary size in bytes. zlib uses at most 32 KiB.
+        codec (str): `zlib` or `zstd`.
+
+    Returns:
+        `bytes` to pass as `dictionary` to `CompressedStore`.
+
+    """
+    samples = [
+        json.dumps(raw_json(data), separators=(',', ':')).encode('utf-8')
+        for data in items if data is not None
+    ]
+    if codec == 'zstd':
+        return _zstandard().train_dictionary(size, samples).as_bytes()
+    # zlib matches against the end of its dictionary most cheaply, so the
+    # dictionary is simply the tail of the concatenated samples.
+    return b''.join(samples)[-min(size, 32 * 1024):]
+
+
+class CompressedStore(object):
+
+    """
+    Item store keeping records in compressed blocks, for large working sets
+
+    Items are encoded as compact JSON and appended to an open block. Every
+    `block_size` items the block is compressed, optionally with a shared
+    dictionary. Lookups decompress one block, and the most recently read
+    records are kept decompressed in an LRU cache.
+
+    Item ids are indexed by a sorted array of ids and a parallel array of
+    record positions, about 12 bytes per item. Recently added ids are kept
+    in a small dict until it is merged into the arrays. A replaced item
+    leaves its old record behind in a sealed block, so the blocks are
+    rewritten without such records once they make up `garbage` of them.
+    """
+
+    def __init__(self, block_size=64, cache_size=10000, codec='zlib',
+                 level=6, dictionary=None, garbage=0.25):
+        """
+
+        Args:
+            block_size (int): number of records per compressed block.
+                Larger blocks compress better but cost more per lookup.
+            cache_size (int): number of decompressed records kept.
+            codec (str): `zlib`, or `zstd` if the `zstandard` package is
+                installed.
+            level (int): compression level.
+            dictionary (bytes): (optional) shared dictionary, see
+                `train_dictionary`.
+            garbage (float): fraction of replaced records in the blocks
+                that triggers `compact()`, None to only compact when
+                asked to.
+
+        """
+        if codec not in ('zlib', 'zstd'):
+            raise ValueError(F"unknown codec {codec}")
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self.codec = codec
+        self.level = level
+        self.dictionary = dictionary
+        self.garbage = garbage
+        self._blocks = []
+        self._open = []
+        self._ids = array.array('q')
+        self._positions = array.array('I')
+        self._recent = {}
+        self._count = 0
+        self._replaced = 0
+        self._cache = collections.OrderedDict()
+        self._last_block = (None, None, None)
+        self._lock = threading.RLock()
+        if codec == 'zstd':
+            zstandard = _zstandard()
+            kwargs = {}
+            if dictionary is not None:
+                kwargs['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+            self._zstd_compressor = zstandard.ZstdCompressor(
+                level=level, **kwargs)
+            self._zstd_decompressor = zstandard.ZstdDecompressor(**kwargs)
+
+    def _compress(self, data):
+        if self.codec == 'zstd':
+            return self._zstd_compressor.compress(data)
+        if self.dictionary is None:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, data):
+        if self.codec == 'zstd':
+            return self._zstd_decompressor.decompress(data)
+        if self.dictionary is None:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zdict=self.dictionary)
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def _seal(self):
+        """Compresses the open block"""
+        ends = array.array('I')
+        end = 0
+        for record in self._open:
+            end += len(record)
+            ends.append(end)
+        self._blocks.append((self._compress(b''.join(self._open)), ends))
+        self._open = []
+
+    def _append(self, record):
+        """Adds a record to the open block and returns its position"""
+        position = len(self._blocks) * self.block_size + len(self._open)
+        self._open.append(record)
+        if len(self._open) == self.block_size:
+            self._seal()
+        return position
+
+    def _record(self, position):
+        block, slot = divmod(position, self.block_size)
+        if block == len(self._blocks):
+            return self._open[slot]
+        cached_block, raw, ends = self._last_block
+        if cached_block != block:
+            compressed, ends = self._blocks[block]
+            raw = self._decompress(compressed)
+            self._last_block = (block, raw, ends)
+        start = ends[slot - 1] if slot else 0
+        return raw[start:ends[slot]]
+
+    def _find(self, item_id):
+        """Returns the index of `item_id` in the id array, or -1"""
+        i = bisect.bisect_left(self._ids, item_id)
+        if i < len(self._ids) and self._ids[i] == item_id:
+            return i
+        return -1
+
+    def _position(self, item_id):
+        position = self._recent.get(item_id)
+        if position is None:
+            i = self._find(item_id)
+            if i >= 0:
+                position = self._positions[i]
+        return position
+
+    def _merge(self):
+        """Moves the recently added ids into the sorted arrays"""
+        if not self._recent:
+            return
+        recent = sorted(self._recent)
+        if not self._ids or recent[0] > self._ids[-1]:
+            # only new ids above the indexed ones, e.g. while crawling
+            self._ids.extend(recent)
+            self._positions.extend(self._recent[i] for i in recent)
+            self._recent = {}
+            return
+        positions = dict(zip(self._ids, self._positions))
+        positions.update(self._recent)
+        ids = sorted(positions)
+        self._ids = array.array('q', ids)
+        self._positions = array.array('I', (positions[i] for i in ids))
+        self._recent = {}
+
+    def _lookup(self, item_id):
+        """Returns the JSON record of an item, or None"""
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            record = self._cache.get(item_id)
+            if record is not None:
+                self._cache.move_to_end(item_id)
+                return record
+            position = self._position(item_id)
+            if position is None:
+                return None
+            record = self._record(position)
+            self._cache[item_id] = record
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return record
+
+    def item(self, item_id):
+        """Returns the `Item` object of an item, or None"""
+        from . import Item
+        data = self.get(item_id)
+        return Item(data) if data is not None else None
+
+    def get(self, item_id):
+        """Returns the stored JSON `dict` of an item, or None"""
+        record = self._lookup(item_id)
+        return json.loads(record) if record is not None else None
+
+    def add(self, data):
+        """Stores one item"""
+        self.extend([data])
+
+    def extend(self, items):
+        """Stores many items
+
+        Args:
+            items (iterable): raw JSON `dict` objects or `Item` objects.
+                A newer version of an item replaces the stored one.
+
+        """
+        with self._lock:
+            for data in items:
+                if data is None:
+                    continue
+                data = raw_json(data)
+                item_id = int(data['id'])
+                record = json.dumps(
+                    data, separators=(',', ':')).encode('utf-8')
+                self._cache.pop(item_id, None)
+                position = self._position(item_id)
+                if position is None:
+                    self._count += 1
+                elif position // self.block_size == len(self._blocks):
+                    # still in the open block, so overwrite in place
+                    self._open[position % self.block_size] = record
+                    continue
+                else:
+                    self._replaced += 1
+                self._recent[item_id] = self._append(record)
+                if len(self._recent) > max(256, len(self._ids) // 8):
+                    self._merge()
+            if (self.garbage is not None and
+                    self._replaced > self.garbage * (
+                        self._count + self._replaced)):
+                self.compact()
+
+    def compact(self):
+        """Rewrites the blocks without the records of replaced items
+
+        Returns:
+            number of records dropped.
+
+        """
+        with self._lock:
+            self._merge()
+            dropped = self._replaced
+            if not dropped:
+                return 0
+            blocks, records = self._blocks, self._open
+            self._blocks, self._open = [], []
+            self._last_block = (None, None, None)
+            positions = self._positions
+            # live records are copied in their current order, each old
+            # block being decompressed once
+            order = sorted(range(len(positions)), key=positions.__getitem__)
+            self._positions = array.array('I', [0]) * len(positions)
+            current, raw, ends = None, None, None
+            for i in order:
+                block, slot = divmod(positions[i], self.block_size)
+                if block == len(blocks):
+                    record = records[slot]
+                else:
+                    if block != current:
+                        compressed, ends = blocks[block]
+                        raw = self._decompress(compressed)
+                        current = block
+                    start = ends[slot - 1] if slot else 0
+                    record = raw[start:ends[slot]]
+                self._positions[i] = self._append(record)
+            self._replaced = 0
+            return dropped
+
+    @property
+    def nbytes(self):
+        """Bytes held by the compressed blocks, the open block and the
+        index"""
+        return (sum(len(block) + len(ends) * ends.itemsize
+                    for block, ends in self._blocks) +
+                sum(len(record) for record in self._open) +
+                len(self._ids) * self._ids.itemsize +
+                len(self._positions) * self._positions.itemsize +
+                sys.getsizeof(self._recent))
+
+    def __contains__(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            return self._position(item_id) is not None
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return '<hackernews.CompressedStore: {0} items, {1} bytes>'.format(
+            len(self), self.nbytes)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+"""
+Incrementally maintained statistics of comment threads.
+
+`ThreadStats` keeps every item it is given in parent-indexed arrays: each
+node has the array index of its parent, its first child and its next
+sibling, so the tree is stored without per-node objects or kids lists. The
+statistics of each thread (comments per depth, fan-out, authors, time to
+first reply) are updated as items are added or change, so refreshing a hot
+thread costs O(changed items) instead of a walk over the whole tree.
+
+Comments can arrive before their parents. They are kept detached, with
+their own replies, and counted once their parent shows up.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import array
+import collections
+
+from .utils import raw_json
+
+
+class Thread(object):
+
+    """
+    Statistics of one story (or job, or poll) and its comments
+
+    `depth_counts[d]` is the number of nodes at depth `d`: 1 for the story
+    at depth 0, then its comments. `fanout[n]` is the number of nodes, the
+    story included, with `n` direct replies.
+    """
+
+    def __init__(self, root_id, time):
+        self.root_id = root_id
+        self.time = time
+        self.comments = 0
+        self.deleted = 0
+        self.depth_counts = [1]
+        self.fanout = collections.Counter()
+        self.authors = collections.Counter()
+        self.first_reply = None
+
+    @property
+    def max_depth(self):
+        return len(self.depth_counts) - 1
+
+    @property
+    def time_to_first_reply(self):
+        """Seconds between the story and its first direct reply, or None"""
+        if self.first_reply is None:
+            return None
+        return self.first_reply - self.time
+
+    def snapshot(self):
+        """Returns the statistics as a plain `dict`"""
+        return {
+            'root_id': self.root_id,
+            'comments': self.comments,
+            'deleted': self.deleted,
+            'depth_counts': list(self.depth_counts),
+            'fanout': dict(self.fanout),
+            'authors': dict(self.authors),
+            'time_to_first_reply': self.time_to_first_reply,
+        }
+
+    def __repr__(self):
+        return '<hackernews.Thread: {0} - {1} comments>'.format(
+            self.root_id, self.comments)
+
+
+class ThreadStats(object):
+
+    """
+    Thread statistics maintained as items are added or updated
+    """
+
+    def __init__(self):
+        self._ids = []
+        self._index = {}
+        self._parent = array.array('q')
+        self._first_child = array.array('q')
+        self._next_sibling = array.array('q')
+        self._root = array.array('q')
+        self._depth = array.array('i')
+        self._kids = array.array('I')
+        self._time = array.array('q')
+        self._deleted = bytearray()
+        self._authors = []
+        self._threads = {}
+        self._orphans = collections.defaultdict(list)
+        self._wanted = set()
+
+    def add(self, data):
+        """Adds or updates one item
+
+        Returns:
+            id of the thread root whose statistics changed, or None.
+
+        """
+        data = raw_json(data)
+        if not data or data.get('type') == 'pollopt':
+            return None
+        item_id = int(data['id'])
+        node = self._index.get(item_id)
+        if node is not None:
+            self._update(node, data)
+        else:
+            node = self._insert(item_id, data)
+        for kid in data.get('kids') or ():
+            if kid not in self._index:
+                self._wanted.add(kid)
+        root = self._root[node]
+        return self._ids[root] if root >= 0 else None
+
+    def extend(self, items):
+        """Adds or updates many items, e.g. the items of `updates()`
+
+        Args:
+            items (iterable): raw JSON `dict` objects or `Item` objects
+
+        Returns:
+            `set` of ids of the thread roots whose statistics changed.
+
+        """
+        changed = set()
+        for data in items:
+            root_id = self.add(data)
+            if root_id is not None:
+                changed.add(root_id)
+        return changed
+
+    def _insert(self, item_id, data):
+        node = len(self._ids)
+        self._ids.append(item_id)
+        self._index[item_id] = node
+        self._parent.append(-1)
+        self._first_child.append(-1)
+        self._next_sibling.append(-1)
+        self._root.append(-1)
+        self._depth.append(-1)
+        self._kids.append(0)
+        self._time.append(data.get('time') or 0)
+        self._deleted.append(bool(data.get('deleted') or data.get('dead')))
+        self._authors.append(data.get('by'))
+        self._wanted.discard(item_id)
+        # replies that arrived before this item
+        for child in self._orphans.pop(item_id, ()):
+            self._link(child, node)
+        parent_id = data.get('parent')
+        if parent_id is None:
+            self._threads[node] = Thread(item_id, self._time[node])
+            self._attach(node, node, 0)
+            return node
+        parent = self._index.get(parent_id)
+        if parent is None:
+            self._orphans[parent_id].append(node)
+            self._wanted.add(parent_id)
+            return node
+        self._link(node, parent)
+        if self._root[parent] >= 0:
+            self._attach(node, self._root[parent], self._depth[parent] + 1)
+        return node
+
+    def _link(self, child, parent):
+        """Makes `child` a reply of `parent`"""
+        self._parent[child] = parent
+        self._next_sibling[child] = self._first_child[parent]
+        self._first_child[parent] = child
+        kids = self._kids[parent]
+        self._kids[parent] = kids + 1
+        root = self._root[parent]
+        if root >= 0:
+            fanout = self._threads[root].fanout
+            fanout[kids] -= 1
+            if not fanout[kids]:
+                del fanout[kids]
+            fanout[kids + 1] += 1
+
+    def _attach(self, node, root, depth):
+        """Counts `node` and its detached replies into the thread `root`"""
+        thread = self._threads[root]
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            self._root[node] = root
+            self._depth[node] = depth
+            thread.fanout[self._kids[node]] += 1
+            if depth > 0:
+                self._count(thread, node, depth)
+            child = self._first_child[node]
+            while child >= 0:
+                stack.append((child, depth + 1))
+                child = self._next_sibling[child]
+
+    def _count(self, thread, node, depth):
+        thread.comments += 1
+        while len(thread.depth_counts) <= depth:
+            thread.depth_counts.append(0)
+        thread.depth_counts[depth] += 1
+        if self._authors[node] is not None:
+            thread.authors[self._authors[node]] += 1
+        if self._deleted[node]:
+            thread.deleted += 1
+        if depth == 1:
+            posted = self._time[node]
+            if thread.first_reply is None or posted < thread.first_reply:
+                thread.first_reply = posted
+
+    def _update(self, node, data):
+        """Applies the changes of an item that is already known"""
+        author = data.get('by')
+        deleted = bool(data.get('deleted') or data.get('dead'))
+        root = self._root[node]
+        if root >= 0 and self._depth[node] > 0:
+            thread = self._threads[root]
+            previous = self._authors[node]
+            if author != previous:
+                if previous is not None:
+                    thread.authors[previous] -= 1
+                    if not thread.authors[previous]:
+                        del thread.authors[previous]
+                if author is not None:
+                    thread.authors[author] += 1
+            if deleted != bool(self._deleted[node]):
+                thread.deleted += 1 if deleted else -1
+        self._authors[node] = author
+        self._deleted[node] = deleted
+
+    def thread(self, item_id):
+        """Returns the `Thread` an item belongs to, or None if the item is
+        unknown or its story has not been added yet"""
+        node = self._index.get(item_id)
+        if node is None or self._root[node] < 0:
+            return None
+        return self._threads[self._root[node]]
+
+    def depth(self, item_id):
+        """Returns the depth of an item in its thread, or None"""
+        node = self._index.get(item_id)
+        if node is None or self._root[node] < 0:
+            return None
+        return self._depth[node]
+
+    def parent(self, item_id):
+        """Returns the id of an item's parent, or None"""
+        node = self._index.get(item_id)
+        if node is None or self._parent[node] < 0:
+            return None
+        return self._ids[self._parent[node]]
+
+    def wanted(self):
+        """Returns the ids of replies and parents that are referenced by
+        known items but were not added yet"""
+        return sorted(self._wanted)
+
+    def refresh(self, client, priority='normal'):
+        """Fetches the `wanted()` items with `client` until none is left
+
+        Only new items are fetched, so keeping a thread current costs one
+        request per new comment plus those of `updates()`.
+
+        Args:
+            client (obj): `HackerNews` client.
+            priority (str): scheduling lane of the requests.
+
+        Returns:
+            `set` of ids of the thread roots whose statistics changed.
+
+        """
+        changed = set()
+        while self._wanted:
+            batch = client.get_items_by_ids(self.wanted(), priority=priority)
+            # deleted and failing items are not asked for again here
+            self._wanted -= batch.missing | batch.failed
+            changed |= self.extend(batch)
+            if not batch:
+                break
+        return changed
+
+    def __contains__(self, item_id):
+        return item_id in self._index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __repr__(self):
+        return '<hackernews.ThreadStats: {0} threads, {1} items>'.format(
+            len(self._threads), len(self))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+"""
+Record/replay transports for running without the live API.
+
+A transport sits between the client and the network. `RecordingTransport`
+passes requests through and saves every response to a cassette file, and
+`ReplayTransport` serves the responses of a cassette without touching the
+network, optionally with simulated latency:
+
+    with HackerNews(transport=RecordingTransport('hn.cassette.gz')) as hn:
+        hn.top_stories(limit=10)
+
+    hn = HackerNews(transport=ReplayTransport('hn.cassette.gz'))
+    hn.top_stories(limit=10)    # same stories, offline
+
+A cassette holds one JSON array per line, `[url, status, milliseconds,
+body]`, and is gzip compressed if its name ends in `.gz`. A URL recorded
+several times is replayed in the recorded order, its last response
+repeating once they run out.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import collections
+import gzip
+import json
+import threading
+import time
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed request is not in the cassette"""
+    pass
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class RecordingTransport(object):
+
+    """
+    Sends requests over the network and records their responses
+    """
+
+    def __init__(self, path, append=False):
+        """
+
+        Args:
+            path (str): cassette file to write.
+            append (bool): add to an existing cassette instead of
+                replacing it. Not supported for gzip cassettes.
+
+        """
+        self.path = path
+        self.recorded = 0
+        self._file = _open(path, 'a' if append else 'w')
+        self._lock = threading.Lock()
+
+    def _record(self, url, status, elapsed, body):
+        line = json.dumps(
+            [url, status, round(elapsed * 1000, 1),
+             body.decode('utf-8', 'replace')],
+            separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self.recorded += 1
+
+    def get(self, url, send):
+        """Sends a request with the synchronous `send(url)`
+
+        Returns:
+            `(status, body)` of the response.
+
+        """
+        started = time.monotonic()
+        status, body = send(url)
+        self._record(url, status, time.monotonic() - started, body)
+        return status, body
+
+    async def fetch(self, url, send):
+        """Sends a request with the coroutine function `send(url)`"""
+        started = time.monotonic()
+        status, body = await send(url)
+        self._record(url, status, time.monotonic() - started, body)
+        return status, body
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return '<hackernews.RecordingTransport: {0} ({1} responses)>'.format(
+            self.path, self.recorded)
+
+
+class ReplayTransport(object):
+
+    """
+    Serves the responses of a cassette instead of using the network
+    """
+
+    def __init__(self, path, latency=None):
+        """
+
+        Args:
+            path (str): cassette file to read.
+            latency (float, str or callable): (optional) simulated seconds
+                per response: a fixed number, `recorded` for the latency
+                measured while recording, or a function called with no
+                arguments per response, e.g.
+                `lambda: random.expovariate(20)`. No delay by default.
+
+        """
+        self.path = path
+        self.latency = latency
+        self.replayed = 0
+        self._responses = collections.defaultdict(list)
+        self._served = collections.Counter()
+        self._lock = threading.Lock()
+        with _open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    url, status, millis, body = json.loads(line)
+                    self._responses[url].append(
+                        (status, millis / 1000.0, body.encode('utf-8')))
+
+    def _next(self, url):
+        """Returns the next recorded `(status, seconds, body)` of `url`"""
+        with self._lock:
+            responses = self._responses.get(url)
+            if not responses:
+                raise CassetteMiss(url)
+            served = self._served[url]
+            self._served[url] += 1
+            self.replayed += 1
+        return responses[min(served, len(responses) - 1)]
+
+    def _delay(self, recorded):
+        if self.latency is None:
+            return 0.0
+        if self.latency == 'recorded':
+            return recorded
+        if callable(self.latency):
+            return self.latency()
+        return self.latency
+
+    def get(self, url, send=None):
+        """Returns the recorded `(status, body)` of `url`
+
+        Raises:
+          CassetteMiss: If `url` was not recorded.
+
+        """
+        status, seconds, body = self._next(url)
+        delay = self._delay(seconds)
+        if delay:
+            time.sleep(delay)
+        return status, body
+
+    async def fetch(self, url, send=None):
+        """Returns the recorded `(status, body)` of `url`, asynchronously"""
+        import asyncio
+        status, seconds, body = self._next(url)
+        delay = self._delay(seconds)
+        if delay:
+            await asyncio.sleep(delay)
+        return status, body
+
+    def rewind(self):
+        """Replays every URL from its first recorded response again"""
+        with self._lock:
+            self._served.clear()
+
+    def close(self):
+        pass
+
+    def __contains__(self, url):
+        return url in self._responses
+
+    def __len__(self):
+        return sum(len(r) for r in self._responses.values())
+
+    def __repr__(self):
+        return '<hackernews.ReplayTransport: {0} ({1} responses)>'.format(
+            self.path, len(self))
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+
+"""
+Small helpers shared by the haxor modules
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import datetime
+import json
+
+
+def raw_json(data):
+    """Returns the raw JSON `dict` of an `Item` or a `dict`"""
+    raw = getattr(data, 'raw', None)
+    return json.loads(raw) if raw is not None else data
+
+
+def timestamp(value):
+    """Returns unix time in seconds of a `datetime` or a number"""
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    return int(value)
@@ -23,6 +23,9 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     test_suite='tests',
+    entry_points={
+        'console_scripts': ['haxor = hackernews.cli:main'],
+    },
     url='https://github.com/avinassh/haxor/',
     license='MIT',
     description='Unofficial Python wrapper for Hacker News API',
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+"""
+Replays the test cassette with the recorded latencies and times the batch
+paths, offline and repeatably:
+
+    python -m tests.benchmark [rounds]
+"""
+
+import sys
+import time
+
+from hackernews import HackerNews
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
+
+
+def timed(name, fn, rounds):
+    started = time.monotonic()
+    for _ in range(rounds):
+        fn()
+    elapsed = (time.monotonic() - started) / rounds
+    print(F"{name:<24} {elapsed * 1000:8.1f} ms")
+
+
+def main(rounds=5):
+    with HackerNews(transport=ReplayTransport(
+            CASSETTE, latency='recorded')) as hn:
+        timed('get_item', lambda: hn.get_item(8863), rounds)
+        timed('get_items_by_ids(49)',
+              lambda: hn.get_items_by_ids(range(1, 50)), rounds)
+        timed('top_stories(10)', lambda: hn.top_stories(limit=10), rounds)
+        timed('get_last(5)', lambda: hn.get_last(5), rounds)
+        timed('get_users_by_ids(3)',
+              lambda: hn.get_users_by_ids(['pg', 'tptacek', 'jacquesm']),
+              rounds)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""
+Offline transports shared by the tests, which need no live API
+
+`CASSETTE` holds hand-written API responses in the cassette format of
+`ReplayTransport`, for the tests of the plain API calls: items 1 to 49
+(37 stories, 10 comments and 2 jobs), item 8863 and its comments, the
+story lists, `maxitem`, `updates` and a few users.
+"""
+
+import asyncio
+import json
+import os
+
+CASSETTE = os.path.join(os.path.dirname(__file__), 'cassettes', 'api.cassette')
+
+
+def key(url):
+    """Returns the id or resource name of an API `url`"""
+    return url.rsplit('/', 1)[1][:-len('.json')]
+
+
+class OfflineTransport(object):
+
+    """
+    Answers the client's requests from dicts or functions
+
+    `items` and `users` map an id to its JSON value, and `resources` maps
+    the other names, e.g. `topstories` or `maxitem`. Each may also be a
+    function of the id. Unknown ids are answered with `null` like the
+    API does, and ids in `fail` with a 500 error.
+    """
+
+    def __init__(self, items=None, users=None, resources=None, fail=(),
+                 delay=0):
+        """
+
+        Args:
+            items (dict or callable): item JSON by `int` id.
+            users (dict or callable): user JSON by id.
+            resources (dict or callable): JSON of the other URLs by name.
+            fail (container): ids and names whose requests fail.
+            delay (float or callable): seconds before each asynchronous
+                response, or a function of the URL returning them.
+
+        """
+        self.items = items or {}
+        self.users = users or {}
+        self.resources = resources or {}
+        self.fail = fail
+        self.delay = delay
+        self.requests = []
+        self.sync_requests = []
+
+    def _respond(self, url):
+        self.requests.append(url)
+        name = key(url)
+        if '/item/' in url:
+            name, table = int(name), self.items
+        elif '/user/' in url:
+            table = self.users
+        else:
+            table = self.resources
+        if name in self.fail:
+            return 500, b''
+        value = table(name) if callable(table) else table.get(name)
+        return 200, json.dumps(value).encode('utf-8')
+
+    def keys(self, kind='item'):
+        """Returns the ids of the requests for items or users so far"""
+        return [int(key(url)) if kind == 'item' else key(url)
+                for url in self.requests if F"/{kind}/" in url]
+
+    def get(self, url, send=None):
+        self.sync_requests.append(url)
+        return self._respond(url)
+
+    async def fetch(self, url, send=None):
+        delay = self.delay(url) if callable(self.delay) else self.delay
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(url)
+
+    def close(self):
+        pass
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+"""
+Tests Archive
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from hackernews import Archive
+from hackernews import HackerNews
+from hackernews import Item
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'items.hxa')
+        self.archive = Archive(self.path)
+
+    def test_add_and_get(self):
+        self.archive.add({'id': 8863, 'by': 'dhouston', 'time': 1175714200})
+        self.assertEqual(self.archive.get(8863)['by'], 'dhouston')
+        self.assertEqual(self.archive.get('8863')['id'], 8863)
+        self.assertIsNone(self.archive.get(8864))
+        self.assertIsNone(self.archive.get(10 ** 9))
+        self.assertIn(8863, self.archive)
+
+    def test_latest_version_wins(self):
+        self.archive.add({'id': 1, 'score': 1})
+        self.archive.add({'id': 1, 'score': 2})
+        self.assertEqual(self.archive.get(1)['score'], 2)
+
+    def test_extend_items_and_reopen(self):
+        items = [Item({'id': i, 'time': i}) for i in (5, 3, 9)]
+        self.archive.extend(items)
+        self.archive.close()
+        self.archive = Archive(self.path)
+        self.assertEqual(list(self.archive.ids()), [3, 5, 9])
+        self.assertEqual(self.archive.get(9), {'id': 9, 'time': 9})
+
+    def test_serves_client_reads(self):
+        self.archive.add({'id': 1, 'type': 'story', 'time': 1})
+        hn = HackerNews(store=self.archive)
+        item = hn.get_item(1)
+        self.assertEqual(item.item_type, 'story')
+        self.assertEqual(hn.get_items_by_ids([1])[0].item_id, 1)
+        hn.session.close()
+
+    def test_concurrent_writers_and_readers(self):
+        errors = []
+
+        def write(first):
+            for start in range(first, first + 2000, 50):
+                self.archive.extend(
+                    {'id': i, 'text': 'x' * (i % 97)}
+                    for i in range(start, start + 50))
+
+        def read():
+            for i in range(1, 8001, 7):
+                data = self.archive.get(i)
+                if data is not None and data['id'] != i:
+                    errors.append(i)
+
+        threads = [threading.Thread(target=write, args=(n * 2000 + 1,))
+                   for n in range(4)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for i in range(1, 8001):
+            self.assertEqual(self.archive.get(i)['text'], 'x' * (i % 97))
+        self.assertEqual(len(list(self.archive.ids())), 8000)
+
+    def test_rejects_invalid_ids(self):
+        size = os.path.getsize(self.path)
+        for item_id in (-1, 1.5, '2', None, True):
+            self.assertRaises(ValueError, self.archive.extend,
+                              [{'id': 3}, {'id': item_id}])
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertNotIn(3, self.archive)
+
+    def test_rejects_foreign_file(self):
+        path = os.path.join(self.tmp, 'other')
+        with open(path, 'wb') as f:
+            f.write(b'not an archive')
+        self.assertRaises(ValueError, Archive, path)
+
+    def tearDown(self):
+        self.archive.close()
+        shutil.rmtree(self.tmp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""
+Tests BatchResult reporting of missing and failed ids
+"""
+
+import unittest
+
+from hackernews import BatchResult
+from hackernews import HackerNews
+from hackernews import Item, User
+
+
+class FlakyHackerNews(HackerNews):
+
+    """Item 2 does not exist, item 3 and user `bob` fail once"""
+
+    def __init__(self):
+        super(FlakyHackerNews, self).__init__()
+        self.requests = []
+
+    async def _request_async(self, url, session):
+        self.requests.append(url)
+        key = url.rsplit('/', 1)[1][:-len('.json')]
+        if key in ('3', 'bob') and self.requests.count(url) == 1:
+            return None, 503, 10
+        if key in ('2', 'eve'):
+            return None, 200, 10
+        if '/user/' in url:
+            return {'id': key}, 200, 10
+        return {'id': int(key), 'type': 'story', 'time': 1}, 200, 10
+
+
+class TestBatchResult(unittest.TestCase):
+
+    def setUp(self):
+        self.hn = FlakyHackerNews()
+
+    def test_missing_and_failed(self):
+        items = self.hn.get_items_by_ids([4, 3, 2, 1])
+        self.assertIsInstance(items, BatchResult)
+        self.assertEqual([i.item_id for i in items], [4, 1])
+        self.assertEqual(items.missing, {2})
+        self.assertEqual(items.failed, {3})
+        self.assertEqual(items.ids, [4, 3, 2, 1])
+        self.assertIsNone(items.results[1])
+        self.assertIsInstance(items.results[3], Item)
+
+    def test_retries_only_failed(self):
+        items = self.hn.get_items_by_ids([4, 3, 2, 1], retries=2)
+        self.assertEqual([i.item_id for i in items], [4, 3, 1])
+        self.assertEqual(items.failed, set())
+        self.assertEqual(len(self.hn.requests), 5)
+
+    def test_item_type_filter(self):
+        items = self.hn.get_items_by_ids([1, 2], item_type='comment')
+        self.assertEqual(items, [])
+        self.assertEqual(items.missing, {2})
+
+    def test_retry_keeps_filter(self):
+        items = self.hn.get_items_by_ids([4, 3, 1], item_type='comment')
+        self.assertEqual(items.failed, {3})
+        items.retry()
+        self.assertEqual(items, [])
+        self.assertEqual(items.failed, set())
+        self.assertEqual(items.results, [None, None, None])
+
+    def test_users(self):
+        users = self.hn.get_users_by_ids(['bob', 'eve', 'pg'], retries=1)
+        self.assertEqual([u.user_id for u in users], ['bob', 'pg'])
+        self.assertIsInstance(users.results[0], User)
+        self.assertEqual(users.missing, {'eve'})
+
+    def test_async_errors_do_not_fail_batch(self):
+        response = self.hn._run_async([
+            'https://hacker-news.firebaseio.com/v0/item/3.json',
+            'https://hacker-news.firebaseio.com/v0/item/1.json',
+        ])
+        self.assertIsNone(response[0])
+        self.assertEqual(response[1]['id'], 1)
+
+    def tearDown(self):
+        self.hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+"""
+Tests the haxor command line tool
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from hackernews import HackerNews
+from hackernews import cli
+from tests.offline import OfflineTransport
+
+
+def item(item_id):
+    if item_id == 13:
+        return None
+    return {'id': item_id, 'type': 'story' if item_id % 2 else 'comment',
+            'by': 'pg', 'time': 1000 + item_id * 10,
+            'title': 'Item %d' % item_id}
+
+
+def offline(**kwargs):
+    """Returns a client of items 1 to 30, where item 7 always fails and
+    item 13 does not exist"""
+    transport = OfflineTransport(
+        items=item, users=lambda user_id: {'id': user_id, 'karma': 1},
+        resources={'maxitem': 30, 'topstories': [3, 1, 5]}, fail={7})
+    return HackerNews(transport=transport, **kwargs)
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def run_cli(self, *argv):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = cli.main(list(argv), client=offline)
+        return status, stdout.getvalue()
+
+    def read_ids(self, path, opener=open):
+        with opener(path, 'rt') as f:
+            return [json.loads(line)['id'] for line in f]
+
+    def test_crawl_range(self):
+        status, output = self.run_cli(
+            'crawl', '--start', '1', '--end', '10', '--retries', '0')
+        self.assertEqual(status, 1)
+        ids = [json.loads(line)['id'] for line in output.splitlines()]
+        self.assertEqual(ids, [1, 2, 3, 4, 5, 6, 8, 9, 10])
+
+    def test_crawl_time_range_compressed(self):
+        path = self.path('items.jsonl.gz')
+        status, _ = self.run_cli(
+            'crawl', '--since', '1170', '--until', '1210', '--type', 'story',
+            '-o', path)
+        self.assertEqual(status, 0)
+        self.assertEqual(self.read_ids(path, gzip.open), [17, 19, 21])
+
+    def test_crawl_resume(self):
+        path, checkpoint = self.path('items.jsonl'), self.path('checkpoint')
+        with open(path, 'w') as f:
+            f.write(json.dumps(item(1)) + '\n')
+        with open(checkpoint, 'w') as f:
+            json.dump({'next': 11, 'stop': 16, 'failed': [7]}, f)
+        status, _ = self.run_cli(
+            'crawl', '--chunk-size', '2', '--checkpoint', checkpoint,
+            '--retries', '0', '-o', path)
+        self.assertEqual(status, 1)
+        self.assertEqual(self.read_ids(path), [1, 11, 12, 14, 15])
+        with open(checkpoint) as f:
+            self.assertEqual(
+                json.load(f), {'next': 16, 'stop': 16, 'failed': [7]})
+
+    def test_tail(self):
+        status, output = self.run_cli(
+            'tail', '--start', '25', '--count', '3', '--format', 'csv',
+            '--interval', '0')
+        self.assertEqual(status, 0)
+        lines = output.splitlines()
+        self.assertTrue(lines[0].startswith('id,type,by,time'))
+        self.assertEqual([line.split(',')[0] for line in lines[1:]],
+                         ['25', '26', '27'])
+
+    def test_stories_and_users(self):
+        _, output = self.run_cli('stories', 'top', '--limit', '2')
+        self.assertEqual(
+            [json.loads(line)['id'] for line in output.splitlines()], [3, 1])
+        status, output = self.run_cli('user', 'pg', 'dang')
+        self.assertEqual(status, 0)
+        self.assertEqual(len(output.splitlines()), 2)
+
+    def test_archive_output(self):
+        path = self.path('items.hxa')
+        self.run_cli('crawl', '--end', '5', '-f', 'archive', '-o', path)
+        archive = cli.Archive(path)
+        self.assertEqual(archive.get(4)['title'], 'Item 4')
+        archive.close()
+
+    def test_options(self):
+        args = cli.parser().parse_args(
+            ['crawl', '-c', 'auto', '--rate', '20', '--since', '2024-01-01'])
+        self.assertEqual(args.concurrency, 'auto')
+        self.assertEqual(args.rate, 20.0)
+        self.assertIsInstance(args.since, int)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, cli.parser().parse_args,
+                              ['crawl', '--concurrency', 'many'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+if __name__ == '__main__':
+    unittest.main()
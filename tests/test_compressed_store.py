@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+"""
+Tests CompressedStore
+"""
+
+import unittest
+
+from hackernews import CompressedStore
+from hackernews import HackerNews
+from hackernews import Item
+from hackernews.store import train_dictionary
+from tests.offline import OfflineTransport
+
+
+def comment(item_id):
+    return {'id': item_id, 'type': 'comment', 'by': 'user%d' % (item_id % 7),
+            'parent': item_id // 2, 'time': 1500000000 + item_id,
+            'text': 'This is comment number %d' % item_id}
+
+
+class TestCompressedStore(unittest.TestCase):
+
+    def test_round_trip(self):
+        store = CompressedStore(block_size=8)
+        store.extend(comment(i) for i in range(1, 101))
+        self.assertEqual(len(store), 100)
+        self.assertEqual(store.get(5), comment(5))
+        self.assertEqual(store.get('100'), comment(100))
+        self.assertIsNone(store.get(101))
+        self.assertIn(42, store)
+        self.assertNotIn('x', store)
+
+    def test_compresses(self):
+        store = CompressedStore(block_size=64)
+        items = [comment(i) for i in range(1, 1025)]
+        store.extend(items)
+        raw = sum(len(Item(data).raw) for data in items)
+        self.assertLess(store.nbytes, raw / 3)
+
+    def test_dictionary(self):
+        dictionary = train_dictionary(comment(i) for i in range(1, 201))
+        plain = CompressedStore(block_size=4)
+        trained = CompressedStore(block_size=4, dictionary=dictionary)
+        for store in (plain, trained):
+            store.extend(comment(i) for i in range(1000, 1400))
+        self.assertLess(trained.nbytes, plain.nbytes)
+        self.assertEqual(trained.get(1234), comment(1234))
+
+    def test_record_cache(self):
+        store = CompressedStore(block_size=2, cache_size=2)
+        store.extend([comment(1), comment(2), comment(3), comment(4)])
+        decompressed = []
+        decompress = store._decompress
+        store._decompress = lambda data: decompressed.append(data) or \
+            decompress(data)
+        self.assertEqual(store.get(1), comment(1))
+        self.assertEqual(store.item(1).text, comment(1)['text'])
+        self.assertEqual(len(decompressed), 1)
+        store.get(3)
+        store.get(4)
+        store.get(1)
+        self.assertEqual(len(decompressed), 3)
+
+    def test_replace(self):
+        store = CompressedStore(block_size=2)
+        store.extend([comment(1), comment(2), comment(3)])
+        store.item(1)
+        store.add(dict(comment(1), text='edited'))
+        store.add(dict(comment(3), text='edited'))
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.item(1).text, 'edited')
+        self.assertEqual(store.get(3)['text'], 'edited')
+        self.assertEqual(store.get(2), comment(2))
+
+    def test_compact(self):
+        store = CompressedStore(block_size=4, garbage=None)
+        store.extend(comment(i) for i in range(1, 41))
+        before = store.nbytes
+        store.extend(dict(comment(i), text='edited') for i in range(1, 21))
+        self.assertGreater(store.nbytes, before)
+        self.assertEqual(store.compact(), 20)
+        self.assertEqual(store.compact(), 0)
+        self.assertEqual(len(store), 40)
+        self.assertLessEqual(store.nbytes, before)
+        self.assertEqual(store.get(7)['text'], 'edited')
+        self.assertEqual(store.get(27), comment(27))
+
+    def test_compacts_automatically(self):
+        store = CompressedStore(block_size=4, garbage=0.5)
+        store.extend(comment(i) for i in range(1, 41))
+        for _ in range(3):
+            store.extend(dict(comment(i), text='edited') for i in range(1, 41))
+        self.assertLessEqual(store._replaced, 40)
+        self.assertLessEqual(sum(len(ends) for _, ends in store._blocks), 80)
+        self.assertEqual(store.get(40)['text'], 'edited')
+
+    def test_compact_index(self):
+        store = CompressedStore(block_size=64)
+        store.extend(comment(i) for i in range(1, 5001))
+        store.extend(comment(i) for i in range(10001, 10101))
+        store.extend(comment(i) for i in range(20000, 5000, -1000))
+        store.compact()
+        self.assertFalse(store._recent)
+        self.assertEqual(list(store._ids), sorted(store._ids))
+        self.assertEqual(len(store), 5115)
+        for item_id in (1, 5000, 6000, 10050, 20000):
+            self.assertEqual(store.get(item_id), comment(item_id))
+        self.assertNotIn(5001, store)
+        # about 12 bytes of index per item, counted in nbytes
+        self.assertLess(store.nbytes - sum(
+            len(block) + len(ends) * ends.itemsize
+            for block, ends in store._blocks) - sum(
+                len(record) for record in store._open), 13 * len(store))
+
+    def test_unknown_codec(self):
+        self.assertRaises(ValueError, CompressedStore, codec='lz4')
+
+    def test_backing_store(self):
+        hn = HackerNews(transport=OfflineTransport(items=comment),
+                        store=CompressedStore(block_size=4))
+        hn.get_items_by_ids(range(1, 11))
+        items = hn.get_items_by_ids(range(1, 11))
+        self.assertEqual(len(items), 10)
+        self.assertEqual(len(hn.transport.requests), 10)
+        hn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
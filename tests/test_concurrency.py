@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""
+Tests Limiter and AdaptiveLimiter
+"""
+
+import asyncio
+import time
+import unittest
+
+from hackernews import AdaptiveLimiter, Limiter
+from hackernews import HackerNews
+
+
+class TestLimiter(unittest.TestCase):
+
+    def test_caps_in_flight(self):
+        limiter = Limiter(3, reserved={})
+        peak = []
+
+        async def request():
+            await limiter.acquire()
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.001)
+            limiter.release(0.001)
+
+        async def crawl():
+            await asyncio.gather(*[request() for _ in range(20)])
+
+        asyncio.run(crawl())
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_cancelled_waiter(self):
+        limiter = Limiter(1)
+
+        async def scenario():
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            limiter.release()
+            await asyncio.sleep(0)
+            return limiter.in_flight
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+    def test_priority_lanes(self):
+        limiter = Limiter(10)
+        order = []
+
+        async def request(lane):
+            await limiter.acquire(lane)
+            order.append(lane)
+            await asyncio.sleep(0.001)
+            limiter.release(0.001)
+
+        async def crawl():
+            bulk = [request('bulk') for _ in range(50)]
+            tasks = [asyncio.ensure_future(r) for r in bulk]
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.in_flight, 8)
+            tasks.append(asyncio.ensure_future(request('interactive')))
+            await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(crawl())
+        self.assertEqual(order.index('interactive'), 8)
+
+    def test_rate(self):
+        limiter = Limiter(10, rate=200)
+        starts = []
+
+        async def request():
+            await limiter.acquire()
+            starts.append(asyncio.get_running_loop().time())
+            limiter.release(0.0)
+
+        async def crawl():
+            await asyncio.gather(*[request() for _ in range(11)])
+
+        asyncio.run(crawl())
+        self.assertGreaterEqual(starts[-1] - starts[0], 0.045)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_client_accepts_int(self):
+        hn = HackerNews(concurrency=8)
+        self.assertEqual(hn.concurrency_limit, 8)
+        self.assertEqual(HackerNews().concurrency_limit, 100)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = AdaptiveLimiter(initial=10, maximum=12, window=10)
+
+    def complete(self, latency=0.01, failed=False):
+        self.limiter.in_flight += 1
+        self.limiter.release(latency, failed)
+
+    def test_additive_increase(self):
+        for _ in range(10):
+            self.complete()
+        self.assertAlmostEqual(self.limiter.limit, 11, delta=0.1)
+        for _ in range(100):
+            self.complete()
+        self.assertEqual(self.limiter.limit, 12)
+
+    def test_multiplicative_decrease(self):
+        self.complete(failed=True)
+        self.assertEqual(self.limiter.limit, 5)
+        self.assertEqual(self.limiter.decreases, 1)
+
+    def test_one_decrease_per_round_trip(self):
+        started = time.monotonic()
+        for _ in range(4):
+            self.limiter.in_flight += 1
+            self.limiter.release(0.01, failed=True, started=started)
+        self.assertEqual(self.limiter.limit, 5)
+        self.assertEqual(self.limiter.decreases, 1)
+        # a request sent after the cut cuts again
+        self.limiter.in_flight += 1
+        self.limiter.release(
+            0.01, failed=True, started=time.monotonic())
+        self.assertEqual(self.limiter.limit, 2.5)
+
+    def test_rising_p99(self):
+        for _ in range(10):
+            self.complete(0.01)
+        limit = self.limiter.limit
+        for _ in range(10):
+            self.complete(1.0)
+        self.assertLess(self.limiter.limit, limit)
+
+    def test_minimum(self):
+        limiter = AdaptiveLimiter(initial=2, minimum=2)
+        limiter.in_flight = 1
+        limiter.release(failed=True)
+        self.assertEqual(limiter.limit, 2)
+
+if __name__ == '__main__':
+    unittest.main()
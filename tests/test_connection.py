@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+Tests ConnectionPolicy and connection warmup
+"""
+
+import http.server
+import json
+import ssl
+import threading
+import time
+import unittest
+
+import requests
+
+from hackernews import AdaptiveLimiter, ConnectionPolicy
+from hackernews import HackerNews
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super(Handler, self).setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        name = self.path.rsplit('/', 1)[1][:-len('.json')]
+        if name == 'maxitem':
+            data = 100
+        elif name == 'slow':
+            time.sleep(1)
+            data = None
+        else:
+            data = {'id': int(name), 'type': 'story', 'time': 1}
+        # answer slowly, so that concurrent requests need connections
+        # of their own
+        time.sleep(0.05)
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def make_connector(policy):
+    connector = policy.connector(10)
+    await connector.close()
+    return connector
+
+
+class TestConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.hn = HackerNews()
+        self.hn.base_url = 'http://127.0.0.1:{0}/v0/'.format(
+            self.server.server_address[1])
+        self.hn.item_url = self.hn.base_url + 'item/'
+
+    def connector(self, policy):
+        return self.hn._loop_thread.run(make_connector(policy))
+
+    def test_verified_tls_by_default(self):
+        connector = self.connector(self.hn.connection)
+        context = connector._ssl
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertTrue(context.check_hostname)
+        self.assertTrue(connector.use_dns_cache)
+        # the CA store is loaded once for every client
+        self.assertIs(self.connector(ConnectionPolicy())._ssl, context)
+
+    def test_opt_out(self):
+        self.assertFalse(self.connector(ConnectionPolicy(verify=False))._ssl)
+
+    def test_warmup_reuses_connections(self):
+        self.assertEqual(self.hn.warmup(4), 4)
+        self.assertEqual(self.server.connections, 4)
+        items = self.hn.get_items_by_ids(range(1, 5))
+        self.assertEqual(len(items), 4)
+        self.assertEqual(self.server.connections, 4)
+
+    def test_timeout(self):
+        limiter = AdaptiveLimiter(initial=10)
+        hn = HackerNews(concurrency=limiter,
+                        connection=ConnectionPolicy(timeout=0.2))
+        failed = set()
+        started = time.monotonic()
+        self.assertEqual(
+            hn._run_async([self.hn.base_url + 'slow.json'], failed=failed),
+            [None])
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(failed, {0})
+        self.assertEqual(limiter.decreases, 1)
+        self.assertRaises(requests.exceptions.Timeout, hn._get_sync,
+                          self.hn.base_url + 'slow.json')
+        self.assertLess(time.monotonic() - started, 1.8)
+        hn.close()
+
+    def tearDown(self):
+        self.hn.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""
+Tests the background event loop used by the sync API
+"""
+
+import asyncio
+import gc
+import threading
+import unittest
+
+from hackernews import HackerNews
+from hackernews.loop import EventLoopThread
+from tests.offline import OfflineTransport
+
+
+async def current_loop():
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop()
+
+
+class TestEventLoopThread(unittest.TestCase):
+
+    def setUp(self):
+        self.loop_thread = EventLoopThread()
+
+    def test_reuses_one_loop(self):
+        first = self.loop_thread.run(current_loop())
+        second = self.loop_thread.run(current_loop())
+        self.assertIs(first, second)
+        self.assertIs(first, self.loop_thread.loop)
+
+    def test_shared_between_threads(self):
+        loops = []
+        threads = [
+            threading.Thread(
+                target=lambda: loops.append(
+                    self.loop_thread.run(current_loop())))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(loops), 8)
+        self.assertEqual(len(set(map(id, loops))), 1)
+
+    def test_inside_running_loop(self):
+        async def outer():
+            return self.loop_thread.run(current_loop())
+        self.assertIsNotNone(asyncio.run(outer()))
+
+    def test_restart_after_stop(self):
+        first = self.loop_thread.run(current_loop())
+        self.loop_thread.stop()
+        self.assertTrue(first.is_closed())
+        self.assertFalse(self.loop_thread.run(current_loop()).is_closed())
+
+    def test_client_close(self):
+        with HackerNews() as hn:
+            self.assertFalse(hn._loop_thread.loop.is_closed())
+        self.assertEqual(hn._aio_sessions, {})
+
+    def test_dropped_client_stops_its_loop(self):
+        def loop_threads():
+            return [thread for thread in threading.enumerate()
+                    if thread.name == 'haxor-event-loop']
+        before = len(loop_threads())
+        sessions = []
+        for item_id in range(20):
+            hn = HackerNews(transport=OfflineTransport(
+                items={item_id: {'id': item_id, 'time': 1}}))
+            hn.get_items_by_ids([item_id])
+            sessions.append(hn._loop_thread.run(hn._client_session()))
+            del hn
+        gc.collect()
+        self.assertEqual(len(loop_threads()), before)
+        self.assertTrue(all(session.closed for session in sessions))
+
+    def tearDown(self):
+        self.loop_thread.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,12 +10,14 @@ Tests supported Hacker News API versions
 import unittest
 
 from hackernews import HackerNews
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetAsync(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
         self.url = 'https://hacker-news.firebaseio.com/v0/item/8863.json'
         self.err_url = 'https://hacker-news.firebaseio.com/v0/items/8863.json'
 
@@ -29,7 +31,7 @@ class TestGetAsync(unittest.TestCase):
         self.assertEqual(response, [None])
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,12 +12,14 @@ import unittest
 from hackernews import HackerNews
 from hackernews import Item, User
 from hackernews import InvalidItemID
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetItem(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_item(self):
         item = self.hn.get_item(8863)
@@ -41,7 +43,7 @@ class TestGetItem(unittest.TestCase):
         self.assertIsInstance(item.kids[0], Item)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+Tests get_items_between()
+"""
+
+import datetime
+import unittest
+
+from hackernews import HackerNews
+from hackernews import Item
+from tests.offline import OfflineTransport
+
+MAX_ITEM = 100000
+# One item a minute, with every 7th item deleted and every 11th missing
+EPOCH = 1160418111
+
+
+def posted(item_id):
+    return EPOCH + 60 * item_id
+
+
+def item(item_id):
+    if item_id > MAX_ITEM or item_id % 11 == 0:
+        return None
+    if item_id % 7 == 0:
+        return {'id': item_id, 'deleted': True, 'time': posted(item_id)}
+    return {'id': item_id, 'type': 'comment', 'time': posted(item_id)}
+
+
+class TestGetItemsBetween(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = OfflineTransport(
+            items=item, resources={'maxitem': MAX_ITEM})
+        self.hn = HackerNews(transport=self.transport)
+
+    def test_get_items_between(self):
+        start = EPOCH + 60 * 5000
+        end = start + 60 * 1440
+        items = list(self.hn.get_items_between(start, end, chunk_size=100))
+        self.assertIsInstance(items[0], Item)
+        self.assertEqual(items[0].item_id, 5000)
+        self.assertEqual(items[-1].item_id, 5000 + 1440)
+        expected = [i for i in range(5000, 6441) if item(i)]
+        self.assertEqual([i.item_id for i in items], expected)
+        # the bounds are found with single blocking requests
+        self.assertLess(len(self.transport.sync_requests), 40)
+
+    def test_datetime_bounds(self):
+        start = datetime.datetime.fromtimestamp(EPOCH + 60 * 200)
+        end = datetime.datetime.fromtimestamp(EPOCH + 60 * 205)
+        items = self.hn.get_items_between(start, end)
+        self.assertEqual([i.item_id for i in items],
+                         [200, 201, 202, 203, 204, 205])
+
+    def test_empty_range(self):
+        late = EPOCH + 60 * (MAX_ITEM + 10)
+        self.assertEqual(list(self.hn.get_items_between(late, late + 60)), [])
+        self.assertEqual(list(self.hn.get_items_between(EPOCH, 0)), [])
+
+    def tearDown(self):
+        self.hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
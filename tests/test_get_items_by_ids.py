@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import Item
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetItemsByIDs(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_items_by_ids(self):
         items = self.hn.get_items_by_ids([1, 2, 3])
@@ -34,7 +36,7 @@ class TestGetItemsByIDs(unittest.TestCase):
         self.assertIsInstance(items[0], Item)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
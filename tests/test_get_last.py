@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import Item
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetLast(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_item(self):
         items = self.hn.get_last(5)
@@ -25,7 +27,7 @@ class TestGetLast(unittest.TestCase):
         self.assertIsInstance(items[0], Item)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import Item
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetMaxItem(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_max_item(self):
         max_item_id = self.hn.get_max_item()
@@ -27,7 +29,7 @@ class TestGetMaxItem(unittest.TestCase):
         self.assertIsInstance(max_item, Item)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import HTTPError
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetSync(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
         self.url = 'https://hacker-news.firebaseio.com/v0/item/8863.json'
         self.err_url = 'https://hacker-news.firebaseio.com/v0/items/8863.json'
 
@@ -29,7 +31,7 @@ class TestGetSync(unittest.TestCase):
         self.assertRaises(HTTPError, self.hn._get_sync, self.err_url)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -13,12 +13,14 @@ import unittest
 from hackernews import HackerNews
 from hackernews import Item, User
 from hackernews import InvalidUserID
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetUser(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_user(self):
         user = self.hn.get_user('pg')
@@ -39,7 +41,7 @@ class TestGetUser(unittest.TestCase):
         self.assertIsInstance(user.stories[0], Item)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import User
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestGetUsersByIDs(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_get_users_by_ids(self):
         users = self.hn.get_users_by_ids(['pg', 'tptacek', 'jacquesm'])
@@ -25,7 +27,7 @@ class TestGetUsersByIDs(unittest.TestCase):
         self.assertIsInstance(users[0], User)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Tests LatencyHistogram, HedgePolicy and hedged requests
+"""
+
+import asyncio
+import unittest
+
+from hackernews import HackerNews
+from hackernews import HedgePolicy, LatencyHistogram
+
+
+class SlowFirstHackerNews(HackerNews):
+
+    def __init__(self, slow=5, **kwargs):
+        super(SlowFirstHackerNews, self).__init__(**kwargs)
+        self.slow = slow
+        self.attempts = 0
+
+    async def _request_async(self, url, session):
+        self.attempts += 1
+        if self.attempts == 1:
+            await asyncio.sleep(self.slow)
+            return 'slow', 200, 4
+        return 'fast', 200, 4
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(0.5))
+        for _ in range(99):
+            histogram.record(0.01)
+        histogram.record(2.0)
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.01, delta=0.001)
+        self.assertAlmostEqual(histogram.percentile(0.99), 0.01, delta=0.001)
+        self.assertAlmostEqual(histogram.percentile(1.0), 2.0, delta=0.2)
+        self.assertAlmostEqual(histogram.mean, 0.0299)
+
+    def test_decay(self):
+        histogram = LatencyHistogram()
+        for _ in range(10):
+            histogram.record(0.5)
+        histogram.decay()
+        self.assertEqual(histogram.count, 5)
+
+
+class TestHedgePolicy(unittest.TestCase):
+
+    def test_budget(self):
+        policy = HedgePolicy(budget=0.1, min_samples=10)
+        for _ in range(10):
+            self.assertIsNone(policy.delay())
+            policy.observe(0.05)
+        self.assertAlmostEqual(policy.delay(), 0.05, delta=0.005)
+        self.assertTrue(policy.allow())
+        self.assertFalse(policy.allow())
+        self.assertEqual(policy.hedges, 1)
+
+    def test_hedged_request(self):
+        policy = HedgePolicy(budget=1.0, min_samples=1)
+        policy.observe(0.01)
+        hn = SlowFirstHackerNews(hedge=policy)
+        result = hn._loop_thread.run(hn._hedged_request_async('url', None))
+        self.assertEqual(result, ('fast', 200, 4))
+        self.assertEqual(hn.attempts, 2)
+        self.assertEqual(policy.wins, 1)
+        hn.close()
+
+    def test_no_hedge_without_budget(self):
+        policy = HedgePolicy(budget=0.0, min_samples=1)
+        policy.observe(0.01)
+        hn = SlowFirstHackerNews(slow=0.1, hedge=policy)
+        result = hn._loop_thread.run(hn._hedged_request_async('url', None))
+        self.assertEqual(result, ('slow', 200, 4))
+        self.assertEqual(hn.attempts, 1)
+        self.assertEqual(policy.hedges, 0)
+        hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+"""
+Tests that importing hackernews stays cheap
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('asyncio', 'requests', 'aiohttp')
+# microseconds; loading requests and aiohttp alone took ~250ms
+IMPORT_BUDGET = 150000
+
+
+def run(code):
+    """Runs `code` in a fresh interpreter with -X importtime
+
+    Returns:
+        `dict` of module name to cumulative import time in microseconds,
+        and the standard output.
+
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times, result.stdout
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_does_not_load_http_stacks(self):
+        times, _ = run('import hackernews; hackernews.HackerNews().close()')
+        for module in HEAVY:
+            self.assertNotIn(module, times)
+
+    def test_import_budget(self):
+        times, _ = run('import hackernews')
+        self.assertLess(times['hackernews'], IMPORT_BUDGET)
+
+    def test_sync_path_loads_requests_only(self):
+        _, stdout = run(
+            'import sys, hackernews\n'
+            'hn = hackernews.HackerNews()\n'
+            'hn.session\n'
+            'print(" ".join(m for m in %r if m in sys.modules))' % (HEAVY,))
+        self.assertEqual(stdout.split(), ['requests'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,12 +11,14 @@ import unittest
 
 from hackernews import HackerNews
 from hackernews import Item
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestJobStories(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_job_stories(self):
         job_stories = self.hn.job_stories(limit=10)
@@ -31,7 +33,7 @@ class TestJobStories(unittest.TestCase):
         self.assertIsNotNone(job_stories)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()
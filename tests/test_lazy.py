@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Tests lazy reference resolution
+"""
+
+import time
+import unittest
+
+from hackernews import HackerNews
+from hackernews import User
+from tests.offline import OfflineTransport
+
+USERS = {'alice': {'id': 'alice', 'created': 1}, 'bob': {'id': 'bob'}}
+ITEMS = {
+    1: {'id': 1, 'type': 'story', 'by': 'alice', 'time': 1, 'kids': [3]},
+    2: {'id': 2, 'type': 'story', 'by': 'bob', 'time': 2, 'kids': [4]},
+    3: {'id': 3, 'type': 'comment', 'by': 'bob', 'time': 3, 'parent': 1},
+    4: {'id': 4, 'type': 'comment', 'by': 'alice', 'time': 4, 'parent': 2},
+}
+
+
+class TestLazy(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = OfflineTransport(items=ITEMS, users=USERS)
+        self.hn = HackerNews(lazy=True, transport=self.transport)
+
+    def test_authors_resolve_in_one_batch(self):
+        stories = self.hn.get_items_by_ids([1, 2])
+        self.assertEqual(self.transport.keys('user'), [])
+        self.assertEqual(stories[0].by.user_id, 'alice')
+        # touching one handle fetched the authors of both stories
+        self.assertEqual(sorted(self.transport.keys('user')),
+                         ['alice', 'bob'])
+        self.assertEqual(stories[1].by.user_id, 'bob')
+        self.assertEqual(len(self.transport.keys('user')), 2)
+        self.assertIsInstance(stories[0].by.value, User)
+
+    def test_batches_are_fetched_separately(self):
+        first = self.hn.get_items_by_ids([1])
+        second = self.hn.get_items_by_ids([2])
+        self.assertEqual(first[0].by.user_id, 'alice')
+        self.assertEqual(self.transport.keys('user'), ['alice'])
+        self.assertEqual(second[0].by.user_id, 'bob')
+        self.assertEqual(self.transport.keys('user'), ['alice', 'bob'])
+
+    def test_max_batch(self):
+        self.hn._item_loader.max_batch = 1
+        stories = self.hn.get_items_by_ids([1, 2])
+        self.assertEqual(stories[1].kids[0].item_id, 4)
+        self.assertEqual(self.transport.keys(), [1, 2, 4])
+        self.assertEqual(stories[0].kids[0].item_id, 3)
+        self.assertEqual(self.transport.keys(), [1, 2, 4, 3])
+
+    def test_kids_are_deduplicated(self):
+        stories = self.hn.get_items_by_ids([1, 2])
+        self.assertEqual(stories[0].kids[0].parent, 1)
+        self.assertEqual(stories[1].kids[0].item_id, 4)
+        self.assertEqual(sorted(self.transport.keys()), [1, 2, 3, 4])
+
+    def test_failed_ids_are_fetched_again(self):
+        self.transport.fail = {'alice'}
+        story = self.hn.get_items_by_ids([1])[0]
+        self.assertIsNone(story.by.value)
+        self.transport.fail = ()
+        self.assertEqual(story.by.user_id, 'alice')
+        self.assertEqual(self.transport.keys('user'), ['alice', 'alice'])
+
+    def test_cache_bound_and_expiry(self):
+        loader = self.hn._user_loader
+        loader.max_entries = 1
+        story, other = self.hn.get_items_by_ids([1, 2])
+        self.assertEqual(story.by.user_id, 'alice')
+        self.assertEqual(other.by.user_id, 'bob')
+        self.assertFalse(loader.resolved('alice'))
+        loader.clear()
+        loader.ttl = 0.01
+        other.by.value
+        time.sleep(0.02)
+        self.assertFalse(loader.resolved('bob'))
+        requests = len(self.transport.keys('user'))
+        self.assertEqual(other.by.user_id, 'bob')
+        self.assertEqual(len(self.transport.keys('user')), requests + 1)
+
+    def test_eager_by_default(self):
+        hn = HackerNews(transport=self.transport)
+        story = hn.get_items_by_ids([1])[0]
+        self.assertEqual(story.by, 'alice')
+        self.assertEqual(story.kids, [3])
+
+    def tearDown(self):
+        self.hn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
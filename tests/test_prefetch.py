@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""
+Tests MemoryStore and comment prefetching for story lists
+"""
+
+import time
+import unittest
+
+from hackernews import HackerNews
+from hackernews import MemoryStore, PrefetchPolicy
+from tests.offline import OfflineTransport, key
+
+
+class Stories(object):
+
+    """Stories 1 and 2 with three comments each, and one more comment and
+    point per `version`"""
+
+    def __init__(self):
+        self.version = 0
+
+    def __call__(self, item_id):
+        if item_id < 10:
+            kids = [item_id * 10 + k for k in range(3 + self.version)]
+            return {'id': item_id, 'type': 'story', 'time': 1,
+                    'score': 1 + self.version, 'kids': kids}
+        return {'id': item_id, 'type': 'comment', 'time': 1}
+
+
+def offline(delay=0, **kwargs):
+    """Returns a client of `Stories`, comments answering after `delay`"""
+    transport = OfflineTransport(
+        items=Stories(),
+        resources={'topstories': [1, 2],
+                   'updates': {'items': [1, 2], 'profiles': []}},
+        delay=lambda url: delay if int(key(url)) >= 10 else 0)
+    return HackerNews(transport=transport, **kwargs)
+
+
+class TestMemoryStore(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        store = MemoryStore(max_entries=2)
+        store.extend([{'id': 1}, {'id': 2}])
+        store.get(1)
+        store.add({'id': 3})
+        self.assertIn(1, store)
+        self.assertNotIn(2, store)
+        self.assertEqual(store.get('3'), {'id': 3})
+
+    def test_ttl(self):
+        store = MemoryStore(ttl=0.05)
+        store.add({'id': 1})
+        self.assertEqual(store.get(1), {'id': 1})
+        time.sleep(0.1)
+        self.assertNotIn(1, store)
+        self.assertIsNone(store.get(1))
+        self.assertEqual(store.nbytes, 0)
+
+    def test_byte_budget(self):
+        store = MemoryStore(max_bytes=20)
+        store.add({'id': 1, 'text': 'x'})
+        store.add({'id': 2, 'text': 'y'})
+        self.assertEqual(len(store), 1)
+        self.assertLessEqual(store.nbytes, 20)
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_prefetch_kids(self):
+        hn = offline(prefetch=PrefetchPolicy(kids=2))
+        stories = hn.top_stories()
+        self.assertEqual(len(stories), 2)
+        hn._prefetch_future.result(timeout=5)
+        self.assertEqual(hn.prefetch.prefetched, 4)
+        requests = len(hn.transport.requests)
+        kids = hn.get_items_by_ids(stories[0].kids[:2])
+        self.assertEqual([k.item_id for k in kids], [10, 11])
+        self.assertEqual(len(hn.transport.requests), requests)
+        hn.close()
+
+    def test_story_lists_are_current(self):
+        hn = offline(prefetch=PrefetchPolicy(kids=10))
+        stories = hn.top_stories()
+        hn._prefetch_future.result(timeout=5)
+        self.assertEqual(stories[0].score, 1)
+        self.assertEqual(hn.prefetch.prefetched, 6)
+        hn.transport.items.version = 1
+        stories = hn.top_stories()
+        self.assertEqual([s.score for s in stories], [2, 2])
+        self.assertEqual(stories[0].kids, [10, 11, 12, 13])
+        self.assertEqual(hn.get_item(1).score, 2)
+        self.assertEqual(len(hn.updates()['items']), 2)
+        # only the new comments are prefetched
+        hn._prefetch_future.result(timeout=5)
+        self.assertEqual(hn.prefetch.prefetched, 8)
+        hn.close()
+
+    def test_new_list_cancels_prefetch(self):
+        hn = offline(delay=5, prefetch=PrefetchPolicy())
+        hn.top_stories()
+        first = hn._prefetch_future
+        hn.top_stories()
+        self.assertTrue(first.cancelled())
+        self.assertEqual(hn.prefetch.cancelled, 1)
+        hn.close()
+
+    def test_off_by_default(self):
+        hn = offline()
+        hn.top_stories()
+        self.assertIsNone(hn._prefetch_future)
+        self.assertIsNone(hn.store)
+        hn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""
+Tests Progress reporting of bulk fetches
+"""
+
+import json
+import unittest
+
+from hackernews import HackerNews
+from hackernews import Progress
+from tests.offline import OfflineTransport
+
+
+def item(item_id):
+    return {'id': item_id, 'time': 1}
+
+
+class TestProgress(unittest.TestCase):
+
+    def setUp(self):
+        # every 10th item request fails
+        self.hn = HackerNews(transport=OfflineTransport(
+            items=item, fail=range(10, 101, 10)))
+
+    def test_counters(self):
+        progress = Progress()
+        items = self.hn.get_items_by_ids(range(1, 101), progress=progress)
+        self.assertEqual(len(items), 90)
+        self.assertEqual(progress.total, 100)
+        self.assertEqual(progress.completed, 100)
+        self.assertEqual(progress.failed, 10)
+        self.assertEqual(progress.errors, {500: 10})
+        self.assertEqual(progress.bytes, sum(
+            len(json.dumps(item(i))) for i in range(1, 101) if i % 10))
+        self.assertEqual(progress.eta, 0.0)
+        self.assertGreater(progress.rate, 0)
+
+    def test_callback(self):
+        snapshots = []
+        self.hn.get_items_by_ids(
+            range(1, 11), progress=lambda p: snapshots.append(p.snapshot()))
+        self.assertEqual(snapshots[-1]['completed'], 10)
+        self.assertEqual(snapshots[-1]['failed'], 1)
+
+    def test_eta(self):
+        progress = Progress(interval=0)
+        progress.expect(100)
+        progress._mark_time -= 1
+        progress.update(count=10)
+        self.assertAlmostEqual(progress.eta, 9.0, delta=0.1)
+
+    def test_retries_count(self):
+        progress = Progress()
+        self.hn.get_items_by_ids([10], retries=2, progress=progress)
+        self.assertEqual(progress.completed, 3)
+
+    def tearDown(self):
+        self.hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+Tests resolve_authors()
+"""
+
+import unittest
+
+from hackernews import HackerNews
+from hackernews import Item, User
+from tests.offline import OfflineTransport
+
+
+def user(user_id):
+    if user_id != 'ghost':
+        return {'id': user_id, 'karma': len(user_id)}
+
+
+def offline(**kwargs):
+    return HackerNews(transport=OfflineTransport(users=user), **kwargs)
+
+
+def comment(item_id, by, kids=None):
+    item = Item({'id': item_id, 'type': 'comment', 'by': by, 'time': 1})
+    item.kids = kids
+    return item
+
+
+class TestResolveAuthors(unittest.TestCase):
+
+    def setUp(self):
+        self.hn = offline()
+
+    def test_resolve_authors(self):
+        thread = comment(1, 'pg', [
+            comment(2, 'dang', [comment(4, 'pg'), comment(5, 'ghost')]),
+            comment(3, 'dang'),
+        ])
+        users = self.hn.resolve_authors([thread])
+        self.assertEqual(len(self.hn.transport.requests), 3)
+        self.assertEqual(sorted(u.user_id for u in users), ['dang', 'pg'])
+        self.assertEqual(users.missing, {'ghost'})
+        self.assertIsInstance(thread.by, User)
+        self.assertIs(thread.kids[0].kids[0].by, thread.by)
+        self.assertIs(thread.kids[1].by, thread.kids[0].by)
+        self.assertEqual(thread.kids[0].kids[1].by, 'ghost')
+
+    def test_lazy_handles(self):
+        hn = offline(lazy=True)
+        item = hn._make_item({'id': 1, 'by': 'pg', 'time': 1})
+        hn.resolve_authors([item])
+        self.assertEqual(item.by.karma, 2)
+        self.assertEqual(len(hn.transport.requests), 1)
+        hn.close()
+
+    def test_lazy_handles_are_not_fetched_again(self):
+        hn = offline(lazy=True)
+        first = hn._make_item({'id': 1, 'by': 'pg', 'time': 1})
+        second = hn._make_item({'id': 2, 'by': 'dang', 'time': 1})
+        ref = first.by
+        hn.resolve_authors([first])
+        self.assertEqual(ref.karma, 2)
+        self.assertEqual(second.by.karma, 4)
+        self.assertEqual(hn.transport.keys('user'), ['pg', 'dang'])
+        hn.close()
+
+    def tearDown(self):
+        self.hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
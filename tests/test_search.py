@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Tests SearchIndex
+"""
+
+import datetime
+import unittest
+
+from hackernews import HackerNews
+from hackernews import Item, MemoryStore
+from hackernews import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.extend([
+            {'id': 1, 'type': 'story', 'by': 'pg', 'time': 100,
+             'title': 'Rust compiler internals'},
+            {'id': 2, 'type': 'comment', 'by': 'dang', 'time': 200,
+             'text': 'The <i>compiler</i> for Rust is slow &amp; big'},
+            Item({'id': 3, 'type': 'comment', 'by': 'pg', 'time': 300,
+                  'text': 'Python compiler'}),
+        ])
+
+    def test_term(self):
+        self.assertEqual(sorted(self.index.search('compiler')), [1, 2, 3])
+        self.assertEqual(self.index.search('rust compiler', order='time'),
+                         [2, 1])
+
+    def test_phrase(self):
+        self.assertEqual(self.index.search('"rust compiler"'), [1])
+        self.assertEqual(self.index.search('"compiler for rust"'), [2])
+
+    def test_filters(self):
+        self.assertEqual(self.index.search('compiler', item_type='story'),
+                         [1])
+        self.assertEqual(
+            sorted(self.index.search('compiler', by='pg')), [1, 3])
+        self.assertEqual(
+            self.index.search('compiler', start=150, end=250), [2])
+        end = datetime.datetime.fromtimestamp(150)
+        self.assertEqual(self.index.search('compiler', end=end), [1])
+
+    def test_reindex(self):
+        self.index.add({'id': 1, 'type': 'story', 'time': 100,
+                        'title': 'Go compiler'})
+        self.assertEqual(self.index.search('rust', item_type='story'), [])
+        self.assertEqual(self.index.search('go'), [1])
+        self.assertEqual(len(self.index), 3)
+
+    def test_store_hits_are_indexed(self):
+        store = MemoryStore()
+        store.extend([
+            {'id': 4, 'type': 'story', 'time': 400, 'title': 'Go compiler'},
+            {'id': 5, 'type': 'story', 'time': 500, 'title': 'Zig compiler'},
+        ])
+        hn = HackerNews(store=store, index=self.index)
+        hn.get_item(4)
+        hn.get_items_by_ids([5])
+        self.assertEqual(self.index.search('go compiler'), [4])
+        self.assertEqual(self.index.search('zig'), [5])
+        hn.close()
+
+    def test_missing(self):
+        self.index.extend({'id': i, 'type': 'comment', 'time': i}
+                          for i in range(1000, 1100))
+        missing = self.index.missing(range(1, 1201))
+        self.assertEqual(len(missing), 1200 - len(self.index))
+        self.assertNotIn(1050, missing)
+        self.assertIn(1150, missing)
+        self.assertEqual(self.index.missing([]), set())
+
+    def test_empty_query(self):
+        self.assertEqual(self.index.search('""'), [])
+
+    def tearDown(self):
+        self.index.close()
+
+if __name__ == '__main__':
+    unittest.main()
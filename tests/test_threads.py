@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+"""
+Tests ThreadStats
+"""
+
+import unittest
+
+from hackernews import HackerNews
+from hackernews import Item, ThreadStats
+from tests.offline import OfflineTransport
+
+
+def story(item_id, kids=()):
+    return {'id': item_id, 'type': 'story', 'by': 'pg', 'time': 1000,
+            'kids': list(kids)}
+
+
+def comment(item_id, parent, by, time, kids=()):
+    return {'id': item_id, 'type': 'comment', 'by': by, 'parent': parent,
+            'time': time, 'kids': list(kids)}
+
+
+THREAD = [
+    story(1, [2, 3]),
+    comment(2, 1, 'dang', 1060, [4, 5]),
+    comment(3, 1, 'pg', 1030),
+    comment(4, 2, 'pg', 1100, [6]),
+    comment(5, 2, 'tptacek', 1200),
+    comment(6, 4, 'dang', 1300),
+]
+
+
+class TestThreadStats(unittest.TestCase):
+
+    def assertStats(self, stats):
+        thread = stats.thread(1)
+        self.assertEqual(thread.comments, 5)
+        self.assertEqual(thread.depth_counts, [1, 2, 2, 1])
+        self.assertEqual(thread.max_depth, 3)
+        self.assertEqual(thread.fanout, {0: 3, 1: 1, 2: 2})
+        self.assertEqual(thread.authors, {'dang': 2, 'pg': 2, 'tptacek': 1})
+        self.assertEqual(thread.time_to_first_reply, 30)
+
+    def test_in_order(self):
+        stats = ThreadStats()
+        self.assertEqual(stats.extend(THREAD), {1})
+        self.assertStats(stats)
+        self.assertEqual(stats.depth(6), 3)
+        self.assertEqual(stats.parent(6), 4)
+        self.assertIs(stats.thread(6), stats.thread(1))
+        self.assertEqual(stats.wanted(), [])
+
+    def test_out_of_order(self):
+        stats = ThreadStats()
+        self.assertEqual(stats.extend(reversed(THREAD[1:])), set())
+        self.assertIsNone(stats.thread(6))
+        self.assertEqual(stats.wanted(), [1])
+        stats.add(Item(THREAD[0]))
+        self.assertStats(stats)
+
+    def test_updates(self):
+        stats = ThreadStats()
+        stats.extend(THREAD)
+        changed = stats.extend([
+            comment(7, 3, 'pg', 1500),
+            {'id': 5, 'type': 'comment', 'parent': 2, 'time': 1200,
+             'deleted': True},
+        ])
+        self.assertEqual(changed, {1})
+        thread = stats.thread(1)
+        self.assertEqual(thread.comments, 6)
+        self.assertEqual(thread.deleted, 1)
+        self.assertEqual(thread.authors, {'dang': 2, 'pg': 3})
+        self.assertEqual(thread.fanout, {0: 3, 1: 2, 2: 2})
+        self.assertEqual(len(stats), 7)
+
+    def test_refresh_fetches_only_new_items(self):
+        items = THREAD + [comment(7, 3, 'pg', 1500)]
+        transport = OfflineTransport(
+            items={data['id']: data for data in items})
+        hn = HackerNews(transport=transport)
+        stats = ThreadStats()
+        stats.extend(THREAD)
+        stats.add(comment(3, 1, 'pg', 1030, [7, 8]))
+        self.assertEqual(stats.wanted(), [7, 8])
+        self.assertEqual(stats.refresh(hn), {1})
+        self.assertEqual(sorted(transport.keys()), [7, 8])
+        self.assertEqual(stats.thread(1).comments, 6)
+        self.assertEqual(stats.wanted(), [])
+        hn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+Tests RecordingTransport and ReplayTransport
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from hackernews import HackerNews
+from hackernews import CassetteMiss, RecordingTransport, ReplayTransport
+
+
+class FakeNetworkHackerNews(HackerNews):
+
+    """Serves items 1 to 20 in place of the network, with 200 missing"""
+
+    def __init__(self, **kwargs):
+        super(FakeNetworkHackerNews, self).__init__(**kwargs)
+        self.sent = 0
+
+    def response(self, url):
+        self.sent += 1
+        name = url.rsplit('/', 1)[1][:-len('.json')]
+        if name == 'topstories':
+            return 200, b'[3,1,2]'
+        if name == 'maxitem':
+            return 200, b'20'
+        if name == '13':
+            return 500, b'{"error":"oops"}'
+        data = {'id': int(name), 'type': 'story', 'time': 1,
+                'title': 'Story %s' % name}
+        return 200, json.dumps(data).encode('utf-8')
+
+    def _send_sync(self, url):
+        return self.response(url)
+
+    async def _send_async(self, url, session=None):
+        await asyncio.sleep(0.01)
+        return self.response(url)
+
+
+class TestTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cassette = os.path.join(self.directory, 'hn.cassette.gz')
+        hn = FakeNetworkHackerNews(
+            transport=RecordingTransport(self.cassette))
+        self.stories = hn.top_stories()
+        self.item = hn.get_item(5)
+        hn.get_items_by_ids(range(10, 16))
+        self.recorded = hn.transport.recorded
+        hn.close()
+
+    def test_recorded(self):
+        self.assertEqual(self.recorded, 11)
+        self.assertEqual(len(ReplayTransport(self.cassette)), 11)
+
+    def test_replay_sync_and_async(self):
+        hn = HackerNews(transport=ReplayTransport(self.cassette))
+        self.assertEqual([s.title for s in hn.top_stories()],
+                         [s.title for s in self.stories])
+        self.assertEqual(hn.get_item(5).raw, self.item.raw)
+        items = hn.get_items_by_ids(range(10, 16))
+        self.assertEqual([i.item_id for i in items], [10, 11, 12, 14, 15])
+        self.assertEqual(items.failed, {13})
+        self.assertEqual(hn._aio_sessions, {})
+        hn.close()
+
+    def test_miss(self):
+        hn = HackerNews(transport=ReplayTransport(self.cassette))
+        self.assertRaises(CassetteMiss, hn.get_item, 6)
+        self.assertEqual(hn.get_items_by_ids([6]).failed, {6})
+        hn.close()
+
+    def test_latency(self):
+        hn = HackerNews(transport=ReplayTransport(
+            self.cassette, latency=0.05))
+        started = time.monotonic()
+        hn.get_items_by_ids(range(10, 16))
+        elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.25)
+        hn.close()
+
+    def test_recorded_latency(self):
+        transport = ReplayTransport(self.cassette, latency='recorded')
+        status, seconds, _ = transport._next(
+            'https://hacker-news.firebaseio.com/v0/item/10.json')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(transport._delay(seconds), 0.009)
+
+    def test_repeated_url(self):
+        path = os.path.join(self.directory, 'maxitem.cassette')
+        with RecordingTransport(path) as recording:
+            for body in (b'1', b'2'):
+                recording.get('maxitem', lambda url: (200, body))
+        replay = ReplayTransport(path)
+        self.assertEqual([replay.get('maxitem')[1] for _ in range(3)],
+                         [b'1', b'2', b'2'])
+        replay.rewind()
+        self.assertEqual(replay.get('maxitem'), (200, b'1'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,12 +10,14 @@ Tests updates()
 import unittest
 
 from hackernews import HackerNews
+from hackernews import ReplayTransport
+from tests.offline import CASSETTE
 
 
 class TestUpdates(unittest.TestCase):
 
     def setUp(self):
-        self.hn = HackerNews()
+        self.hn = HackerNews(transport=ReplayTransport(CASSETTE))
 
     def test_top_stories(self):
         updates = self.hn.updates()
@@ -25,7 +27,7 @@ class TestUpdates(unittest.TestCase):
         self.assertIsInstance(updates['items'], list)
 
     def tearDown(self):
-        self.hn.session.close()
+        self.hn.close()
 
 if __name__ == '__main__':
     unittest.main()